@@ -1,8 +1,172 @@
 import hashlib
+import io
+import logging
+import mmap
 import os
 import pickle
+import re
+import stat
+import tempfile
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Try to import xxhash - fall back to hashlib.md5 when it is not installed
+try:
+    import xxhash
+
+    XXHASH_AVAILABLE = True
+    _KEY_HASH = xxhash.xxh3_64_hexdigest
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+    def _KEY_HASH(data: bytes) -> str:
+        return hashlib.md5(data).hexdigest()
+
+
+# Try to import msgspec - fall back to pickle when it is not installed
+try:
+    import msgspec
+
+    MSGSPEC_AVAILABLE = True
+except ImportError:
+    MSGSPEC_AVAILABLE = False
+    msgspec = None
+
+
+# Try to import redis - the shared second cache tier is optional
+try:
+    import redis
+
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+    redis = None
+
+
+logger = logging.getLogger(__name__)
+
+# Number of source files whose content fingerprints are remembered
+_FINGERPRINT_CACHE_SIZE = 4096
+
+# Cache keys may be prefixed with the shortcode type, e.g. "csv:/data/a.csv:,"
+# The file path runs up to the first colon or whitespace after the prefix
+_PREFIXED_KEY_RE = re.compile(
+    r"^(?:csv|json|excel|pdf|pdf_table|ocr|video|test):([^:\s]+)"
+)
+
+# Cache files written with msgspec start with this header; anything else is
+# a pickle payload, read only while pickle entries are allowed
+_MSGPACK_MAGIC = b"DMDMP1"
+_DATAFRAME_EXT_CODE = 1
+
+# Redis keys are namespaced so clear() only touches DataMD entries
+_REDIS_PREFIX = "datamd:"
+
+# Files above the full-hash limit are fingerprinted from this many leading
+# bytes plus their size and modification time
+_FINGERPRINT_HEAD_BYTES = 64 * 1024
+
+
+def _enc_hook(obj: Any) -> Any:
+    """Encode pandas DataFrames as Parquet bytes inside a msgpack extension."""
+    if hasattr(obj, "to_parquet"):
+        buf = io.BytesIO()
+        obj.to_parquet(buf)
+        return msgspec.msgpack.Ext(_DATAFRAME_EXT_CODE, buf.getvalue())
+    raise NotImplementedError(f"Cannot cache objects of type {type(obj)!r}")
+
+
+def _ext_hook(code: int, data: memoryview) -> Any:
+    """Decode msgpack extensions written by :func:`_enc_hook`."""
+    if code == _DATAFRAME_EXT_CODE:
+        import pandas as pd
+
+        return pd.read_parquet(io.BytesIO(data))
+    raise NotImplementedError(f"Unknown cache extension type: {code}")
+
+
+if MSGSPEC_AVAILABLE:
+    _ENCODER = msgspec.msgpack.Encoder(enc_hook=_enc_hook)
+    _DECODER = msgspec.msgpack.Decoder(ext_hook=_ext_hook)
+
+# msgspec.DecodeError is a ValueError subclass
+_DECODE_ERRORS = (pickle.PickleError, EOFError, ValueError)
+
+
+def _serialize(data: Any, allow_pickle: bool = True) -> bytes:
+    """
+    Serialize data for the cache.
+
+    Uses msgspec's msgpack encoder when available. Data msgspec can't encode
+    (or a DataFrame Parquet can't represent) falls back to pickle.
+
+    Args:
+        data (Any): Data to serialize
+        allow_pickle (bool): Whether the pickle fallback may be used
+
+    Raises:
+        TypeError: If the data needs pickle and pickle is not allowed
+    """
+    if MSGSPEC_AVAILABLE:
+        try:
+            return _MSGPACK_MAGIC + _ENCODER.encode(data)
+        except (TypeError, ValueError, ImportError, NotImplementedError):
+            pass
+    if not allow_pickle:
+        raise TypeError(f"Cannot cache {type(data)!r} without pickle")
+    return pickle.dumps(data)
+
+
+def _deserialize(payload: memoryview, allow_pickle: bool = True) -> Any:
+    """
+    Deserialize data written by :func:`_serialize`.
+
+    Args:
+        payload (memoryview): Serialized entry
+        allow_pickle (bool): Whether entries without the msgpack header may
+            be unpickled. Unpickling runs arbitrary code, so only trusted
+            entries should be read this way.
+
+    Raises:
+        ValueError: If the entry can't be read
+    """
+    header_len = len(_MSGPACK_MAGIC)
+    if payload[:header_len] == _MSGPACK_MAGIC:
+        if not MSGSPEC_AVAILABLE:
+            raise ValueError("msgspec is required to read this cache file")
+        return _DECODER.decode(payload[header_len:])
+    if not allow_pickle:
+        raise ValueError("Cache entry is not msgpack-framed")
+    return pickle.loads(payload)
+
+
+def _read_file(path: Path) -> memoryview:
+    """
+    Read a whole file into a preallocated buffer.
+
+    The file is opened unbuffered and read straight into a bytearray sized
+    from its stat result, avoiding an intermediate copy through Python's IO
+    buffer.
+    """
+    with open(path, "rb", buffering=0) as f:
+        buf = bytearray(os.fstat(f.fileno()).st_size)
+        view = memoryview(buf)
+        n = 0
+        while n < len(buf):
+            count = f.readinto(view[n:])
+            if not count:
+                break
+            n += count
+    return view[:n]
+
+
+def _delete_shared_entries(client: Any) -> None:
+    """Delete every DataMD entry from Redis without blocking it on KEYS."""
+    keys = list(client.scan_iter(match=_REDIS_PREFIX + "*", count=1000))
+    if keys:
+        client.delete(*keys)
 
 
 class CacheManager:
@@ -10,16 +174,42 @@ class CacheManager:
     Cache manager for DataMD application.
 
     Provides file-based caching with automatic invalidation based on file
-    modification times.
+    modification times. Keys include a digest of the source file's contents,
+    so an in-place edit never returns a stale entry.
+
+    With a Redis URL, entries are also written to Redis, and local misses
+    are looked up there, so other processes and hosts reuse each other's
+    results. Because keys already cover the file contents, a Redis entry
+    is valid wherever the same file is rendered. Only msgpack entries are
+    exchanged through Redis: anyone who can write to the server could
+    otherwise have a pickle payload run on every host that reads it.
     """
 
-    def __init__(self, cache_dir: Optional[str] = None):
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        redis_url: Optional[str] = None,
+        allow_pickle: bool = True,
+        full_hash_max_bytes: Optional[int] = None,
+        redis_ttl: int = 86400,
+    ):
         """
         Initialize cache manager.
 
         Args:
             cache_dir (str, optional): Directory to store cache files.
                                      If None, uses ~/.cache/datamd or ./cache
+            redis_url (str, optional): Redis server for the shared cache
+                tier, e.g. "redis://localhost:6379/0"
+            allow_pickle (bool): Read and write pickle entries for data
+                msgpack can't hold. When False, pickle entries are treated
+                as misses and deleted, and such data is not cached.
+            full_hash_max_bytes (int, optional): Largest source file whose
+                whole contents are hashed into cache keys; bigger files use
+                their first bytes, size and modification time. None hashes
+                every file in full.
+            redis_ttl (int): Seconds Redis keeps an entry, or 0 to keep it
+                until Redis evicts it
         """
         if cache_dir is None:
             # Try to use user cache directory
@@ -32,6 +222,48 @@ class CacheManager:
 
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.allow_pickle = allow_pickle
+        self.full_hash_max_bytes = full_hash_max_bytes
+
+        # source path -> (mtime_ns, size, content digest)
+        self._fingerprints: "OrderedDict[str, Tuple[int, int, str]]" = OrderedDict()
+        # Guards the fingerprint table; shortcodes may be rendered on
+        # several threads
+        self._memo_lock = threading.Lock()
+
+        self._redis = None
+        self.redis_ttl = redis_ttl
+        if redis_url:
+            if REDIS_AVAILABLE:
+                self._redis = redis.Redis.from_url(
+                    redis_url, socket_timeout=1, socket_connect_timeout=1
+                )
+            else:
+                logger.warning("redis is not installed; ignoring %s", redis_url)
+
+    def _redis_call(self, operation: Callable[[Any], Any]) -> Any:
+        """
+        Run an operation on the Redis client, dropping to the local cache on
+        failure.
+
+        The first connection or protocol error disables the Redis tier for
+        this manager so an unreachable server only costs one timeout.
+
+        Args:
+            operation (callable): Called with the Redis client
+
+        Returns:
+            Any: The operation's result, or None if Redis is off or failed
+        """
+        client = self._redis
+        if client is None:
+            return None
+        try:
+            return operation(client)
+        except redis.RedisError as e:
+            logger.warning("Redis cache unavailable, using local cache only: %s", e)
+            self._redis = None
+            return None
 
     def _get_cache_key(self, file_path: str, **kwargs) -> str:
         """
@@ -44,12 +276,70 @@ class CacheManager:
         Returns:
             str: Cache key
         """
-        # Create a hash of the file path and parameters
-        hash_input = file_path
+        # Create a hash of the file path, its contents and parameters. Cache
+        # keys are not security sensitive, so a fast non-cryptographic hash
+        # is used when available.
+        buf = bytearray(file_path.encode())
+        fingerprint = self._get_file_fingerprint(file_path)
+        if fingerprint is not None:
+            buf.extend(f"|content={fingerprint}".encode())
         for key, value in sorted(kwargs.items()):
-            hash_input += f"|{key}={value}"
+            buf.extend(f"|{key}={value}".encode())
+
+        return _KEY_HASH(buf)
+
+    def _get_file_fingerprint(self, file_path: str) -> Optional[str]:
+        """
+        Hash the contents of a source file.
 
-        return hashlib.md5(hash_input.encode()).hexdigest()
+        The file is hashed through a read-only memory map, and the digest is
+        reused while the file's modification time and size are unchanged.
+        Files above :pyattr:`full_hash_max_bytes` are only read up to
+        ``_FINGERPRINT_HEAD_BYTES``, so a lookup for a handler that previews
+        a large file doesn't read all of it; their size and modification
+        time stand in for the rest.
+
+        Args:
+            file_path (str): Path to the file
+
+        Returns:
+            str: Content digest, or None if the path is not a regular file
+        """
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return None
+        if not stat.S_ISREG(st.st_mode):
+            return None
+
+        with self._memo_lock:
+            cached = self._fingerprints.get(file_path)
+            if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+                self._fingerprints.move_to_end(file_path)
+                return cached[2]
+
+        limit = self.full_hash_max_bytes
+        try:
+            with open(file_path, "rb") as f:
+                if limit is not None and st.st_size > limit:
+                    buf = bytearray(f.read(_FINGERPRINT_HEAD_BYTES))
+                    buf.extend(f"|{st.st_size}|{st.st_mtime_ns}".encode())
+                    digest = _KEY_HASH(buf)
+                elif st.st_size:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        digest = _KEY_HASH(mm)
+                else:
+                    # Empty files can't be memory-mapped
+                    digest = _KEY_HASH(b"")
+        except (OSError, ValueError):
+            return None
+
+        with self._memo_lock:
+            self._fingerprints[file_path] = (st.st_mtime_ns, st.st_size, digest)
+            self._fingerprints.move_to_end(file_path)
+            if len(self._fingerprints) > _FINGERPRINT_CACHE_SIZE:
+                self._fingerprints.popitem(last=False)
+        return digest
 
     def _get_cache_file_path(self, cache_key: str) -> Path:
         """
@@ -63,6 +353,24 @@ class CacheManager:
         """
         return self.cache_dir / f"{cache_key}.cache"
 
+    def _get_source_mtime(self, source_file: str) -> Optional[float]:
+        """
+        Get the modification time of a source file.
+
+        Not memoized: an edit made right after a lookup must still make
+        older entries stale.
+
+        Args:
+            source_file (str): Path to source file
+
+        Returns:
+            float: Modification time, or None if the file doesn't exist
+        """
+        try:
+            return os.stat(source_file).st_mtime
+        except OSError:
+            return None
+
     def _is_cache_valid(self, cache_file: Path, source_file: str) -> bool:
         """
         Check if cache is valid (not expired and source file hasn't changed).
@@ -74,68 +382,42 @@ class CacheManager:
         Returns:
             bool: True if cache is valid
         """
-        print(f"Validating cache: cache_file={cache_file}, source_file={source_file}")
-        print(f"Cache file exists: {cache_file.exists()}")
-
-        if not cache_file.exists():
+        # A single stat call both checks existence and yields the mtime
+        try:
+            cache_mtime = os.stat(cache_file).st_mtime
+        except OSError:
             return False
 
         # If source file doesn't exist, we can't validate the cache
         # Check if the source_file is a real file path or a prefixed key
-        source_exists = os.path.exists(source_file)
-        print(f"Source file exists: {source_exists}")
+        source_mtime = self._get_source_mtime(source_file)
 
-        if not source_exists:
+        if source_mtime is None:
             # Try to extract actual file path from prefixed key
-            # Look for common prefixes and extract the file path part
-            prefixes = [
-                "csv:",
-                "json:",
-                "excel:",
-                "pdf:",
-                "pdf_table:",
-                "ocr:",
-                "video:",
-                "test:",
-            ]
-            actual_file_path = source_file
-            for prefix in prefixes:
-                if source_file.startswith(prefix):
-                    actual_file_path = source_file[len(prefix) :]
-                    # Try to find the first colon or space to separate the file
-                    # path from other parameters
-                    separators = [":", " "]
-                    for sep in separators:
-                        if sep in actual_file_path:
-                            actual_file_path = actual_file_path.split(sep, 1)[0]
-                    break
-
-            # Check if the extracted path exists
-            source_exists = os.path.exists(actual_file_path)
-            print(f"Extracted file path: {actual_file_path}, exists: {source_exists}")
-
-            if not source_exists:
+            match = _PREFIXED_KEY_RE.match(source_file)
+            if match:
+                source_mtime = self._get_source_mtime(match.group(1))
+
+            if source_mtime is None:
                 # In this case, we'll assume the cache is valid if it exists
                 # This allows caching of processed data even if source is
                 # temporarily unavailable
                 return True
 
         # If we have a valid source file path, check modification times
-        try:
-            cache_mtime = cache_file.stat().st_mtime
-            source_mtime = os.path.getmtime(
-                actual_file_path if "actual_file_path" in locals() else source_file
-            )
-            result = cache_mtime > source_mtime
-            print(
-                f"Cache validation: cache_mtime={cache_mtime}, "
-                f"source_mtime={source_mtime}, valid={result}"
+        result = cache_mtime > source_mtime
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Cache validation",
+                extra={
+                    "cache_file": str(cache_file),
+                    "source_file": source_file,
+                    "cache_mtime": cache_mtime,
+                    "source_mtime": source_mtime,
+                    "valid": result,
+                },
             )
-            return result
-        except OSError as e:
-            print(f"Error getting modification times: {e}")
-            # If we can't get modification times, assume cache is valid
-            return True
+        return result
 
     def get(self, file_path: str, **kwargs) -> Optional[Any]:
         """
@@ -153,19 +435,23 @@ class CacheManager:
 
         # Check if cache is valid
         is_valid = self._is_cache_valid(cache_file, file_path)
-        print(
-            f"Cache GET: file_path={file_path}, cache_key={cache_key}, valid={is_valid}"
-        )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Cache GET",
+                extra={
+                    "file_path": file_path,
+                    "cache_key": cache_key,
+                    "valid": is_valid,
+                },
+            )
 
         if not is_valid:
-            return None
+            return self._get_shared(file_path, cache_key)
 
         # Load cached data
         try:
-            with open(cache_file, "rb") as f:
-                data = pickle.load(f)
-            return data
-        except (pickle.PickleError, IOError, EOFError):
+            return _deserialize(_read_file(cache_file), self.allow_pickle)
+        except _DECODE_ERRORS + (IOError,):
             # If cache is corrupted, remove it
             try:
                 cache_file.unlink()
@@ -173,6 +459,58 @@ class CacheManager:
                 pass
             return None
 
+    def _is_shareable(self, file_path: str) -> bool:
+        """
+        Check whether entries for a file may go to Redis.
+
+        Only keys that cover the source file's contents are shared; entries
+        for prefixed keys are validated by local modification times, which
+        mean nothing on another host.
+        """
+        return (
+            self._redis is not None
+            and self._get_file_fingerprint(file_path) is not None
+        )
+
+    def _get_shared(self, file_path: str, cache_key: str) -> Optional[Any]:
+        """
+        Look an entry up in Redis and keep a local copy of any hit.
+
+        Args:
+            file_path (str): Path to the file
+            cache_key (str): Cache key
+
+        Returns:
+            Any: Cached data or None if not found
+        """
+        if not self._is_shareable(file_path):
+            return None
+        key = _REDIS_PREFIX + cache_key
+        payload = self._redis_call(lambda client: client.get(key))
+        if payload is None:
+            return None
+        try:
+            # Never unpickle what another host wrote
+            data = _deserialize(memoryview(payload), allow_pickle=False)
+        except _DECODE_ERRORS:
+            return None
+        self._write_local(cache_key, payload)
+        return data
+
+    def _write_local(self, cache_key: str, payload: bytes) -> None:
+        """Write a serialized entry to the cache directory."""
+        cache_file = self._get_cache_file_path(cache_key)
+        # Written in one call to a temporary file that is then moved into
+        # place, so readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(payload)
+            os.replace(tmp_path, cache_file)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
     def set(self, file_path: str, data: Any, **kwargs) -> bool:
         """
         Cache data for a file.
@@ -186,17 +524,22 @@ class CacheManager:
             bool: True if caching was successful
         """
         cache_key = self._get_cache_key(file_path, **kwargs)
-        cache_file = self._get_cache_file_path(cache_key)
 
-        print(f"Cache SET: file_path={file_path}, cache_key={cache_key}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Cache SET", extra={"file_path": file_path, "cache_key": cache_key}
+            )
 
         try:
-            # Serialize and save data
-            with open(cache_file, "wb") as f:
-                pickle.dump(data, f)
-            return True
-        except (pickle.PickleError, IOError):
+            payload = _serialize(data, self.allow_pickle)
+            self._write_local(cache_key, payload)
+        except (pickle.PickleError, TypeError, IOError):
             return False
+        if payload.startswith(_MSGPACK_MAGIC) and self._is_shareable(file_path):
+            key = _REDIS_PREFIX + cache_key
+            ttl = self.redis_ttl or None
+            self._redis_call(lambda client: client.set(key, payload, ex=ttl))
+        return True
 
     def clear(self) -> bool:
         """
@@ -205,9 +548,19 @@ class CacheManager:
         Returns:
             bool: True if clearing was successful
         """
+        # The cache directory may be shared with other files, so only cache
+        # entries are removed rather than deleting the whole tree
+        with self._memo_lock:
+            self._fingerprints.clear()
+        self._redis_call(_delete_shared_entries)
         try:
-            for cache_file in self.cache_dir.glob("*.cache"):
-                cache_file.unlink()
+            with os.scandir(self.cache_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".cache") and entry.is_file():
+                        try:
+                            os.unlink(entry.path)
+                        except FileNotFoundError:
+                            pass
             return True
         except OSError:
             return False
@@ -219,12 +572,22 @@ class CacheManager:
         Returns:
             dict: Cache information
         """
-        cache_files = list(self.cache_dir.glob("*.cache"))
-        total_size = sum(f.stat().st_size for f in cache_files if f.exists())
+        # One directory pass; DirEntry caches its stat result
+        cache_files = 0
+        total_size = 0
+        with os.scandir(self.cache_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith(".cache") and entry.is_file():
+                    try:
+                        total_size += entry.stat().st_size
+                    except FileNotFoundError:
+                        # Removed since the directory was read
+                        continue
+                    cache_files += 1
 
         return {
             "cache_dir": str(self.cache_dir),
-            "cache_files": len(cache_files),
+            "cache_files": cache_files,
             "total_size_bytes": total_size,
             "total_size_mb": round(total_size / (1024 * 1024), 2),
         }
@@ -232,21 +595,38 @@ class CacheManager:
 
 # Global cache manager instance
 _cache_manager = None
+_cache_manager_lock = threading.Lock()
 
 
-def get_cache_manager(cache_dir: Optional[str] = None) -> CacheManager:
+def get_cache_manager(
+    cache_dir: Optional[str] = None,
+    redis_url: Optional[str] = None,
+    allow_pickle: bool = True,
+    full_hash_max_bytes: Optional[int] = None,
+    redis_ttl: int = 86400,
+) -> CacheManager:
     """
     Get singleton cache manager instance.
 
     Args:
         cache_dir (str, optional): Directory to store cache files
+        redis_url (str, optional): Redis server for the shared cache tier
+        allow_pickle (bool): Whether pickle cache entries are read and written
+        full_hash_max_bytes (int, optional): Largest source file hashed in
+            full for cache keys
+        redis_ttl (int): Seconds Redis keeps an entry (0 for no expiry)
 
     Returns:
         CacheManager: Cache manager instance
     """
     global _cache_manager
     if _cache_manager is None:
-        _cache_manager = CacheManager(cache_dir)
+        with _cache_manager_lock:
+            # Re-check under the lock in case another thread got here first
+            if _cache_manager is None:
+                _cache_manager = CacheManager(
+                    cache_dir, redis_url, allow_pickle, full_hash_max_bytes, redis_ttl
+                )
     return _cache_manager
 
 
@@ -1,7 +1,51 @@
 import json
 import os
+import stat
+import tempfile
+import threading
+from types import MappingProxyType
 from typing import Any, Dict, List, Optional
 
+# Try to import orjson - fall back to the standard library json module
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
+
+# Marks key paths memoized as not present in the configuration
+_MISSING = object()
+
+
+def _freeze(sections: Dict[str, Dict[str, Any]]) -> "MappingProxyType[str, Any]":
+    """Wrap a two-level settings dict in read-only mapping proxies."""
+    return MappingProxyType(
+        {name: MappingProxyType(values) for name, values in sections.items()}
+    )
+
+
+def _json_loads(data: bytes) -> Any:
+    """Parse JSON with orjson when available."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(data: Any) -> bytes:
+    """Serialize data as indented JSON with orjson when available."""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(
+                data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+            )
+        except TypeError:
+            # orjson.JSONEncodeError, e.g. for integers wider than 64 bits,
+            # which the json module still writes
+            pass
+    return json.dumps(data, indent=2).encode("utf-8")
+
 
 class Configuration:
     """
@@ -11,59 +55,106 @@ class Configuration:
     and provides default values.
     """
 
-    # Default configuration values
-    DEFAULTS = {
-        "application": {
-            "name": "DataMD Processor",
-            "version": "1.0.0",
-            "environment": "production",
-        },
-        "features": {
-            "ocr_enabled": True,
-            "pdf_processing": True,
-            "video_support": True,
-            "excel_formats": ["xlsx", "xls", "xlsm", "ods"],
-        },
-        "limits": {
-            "max_file_size_mb": 100,
-            "max_pages_pdf": 50,
-            "supported_languages": ["eng", "spa", "fra", "deu", "ind"],
-        },
-        "processing": {
-            "default_csv_separator": ",",
-            "default_pdf_strategy": "lines",
-            "default_ocr_language": "eng",
-            "video_thumb_width": 320,
-            "video_thumb_height": 240,
-        },
-        "performance": {
-            "chunk_size": 10000,
-            "max_memory_mb": 100,
-            "streaming_threshold_mb": 10,
-        },
-        "security": {
-            "allow_directory_traversal": False,
-            "max_filename_length": 255,
-            "allowed_file_extensions": [
-                ".csv",
-                ".json",
-                ".xlsx",
-                ".xls",
-                ".xlsm",
-                ".ods",
-                ".pdf",
-                ".jpg",
-                ".jpeg",
-                ".png",
-                ".gif",
-                ".bmp",
-                ".mp4",
-                ".avi",
-                ".mov",
-                ".wmv",
-            ],
-        },
-    }
+    # Default configuration values. Sections are read-only and shared by all
+    # instances; an instance copies a section the first time it writes to it.
+    DEFAULTS = _freeze(
+        {
+            "application": {
+                "name": "DataMD Processor",
+                "version": "1.0.0",
+                "environment": "production",
+            },
+            "features": {
+                "ocr_enabled": True,
+                "pdf_processing": True,
+                "video_support": True,
+                "excel_formats": ["xlsx", "xls", "xlsm", "ods"],
+            },
+            "limits": {
+                "max_file_size_mb": 100,
+                "max_pages_pdf": 50,
+                "max_table_rows": 500,
+                "supported_languages": ["eng", "spa", "fra", "deu", "ind"],
+            },
+            "processing": {
+                "default_csv_separator": ",",
+                "default_pdf_strategy": "lines",
+                "default_ocr_language": "eng",
+                "tessdata_path": "",
+                "ocr_max_dimension": 0,
+                "video_thumb_width": 320,
+                "video_thumb_height": 240,
+            },
+            "performance": {
+                "chunk_size": 10000,
+                "max_memory_mb": 100,
+                "streaming_threshold_mb": 10,
+                "max_workers": 0,
+            },
+            "cache": {
+                "redis_url": "",
+                "redis_ttl": 86400,
+                "allow_pickle": True,
+            },
+            "security": {
+                "allow_directory_traversal": False,
+                "max_filename_length": 255,
+                "allowed_file_extensions": [
+                    ".csv",
+                    ".json",
+                    ".xlsx",
+                    ".xls",
+                    ".xlsm",
+                    ".ods",
+                    ".pdf",
+                    ".jpg",
+                    ".jpeg",
+                    ".png",
+                    ".gif",
+                    ".bmp",
+                    ".mp4",
+                    ".avi",
+                    ".mov",
+                    ".wmv",
+                ],
+            },
+        }
+    )
+
+    # Environment variable overrides: (variable, section, key, value type)
+    ENV_OVERRIDES = (
+        # Application settings
+        ("DATAMD_APP_NAME", "application", "name", str),
+        ("DATAMD_APP_VERSION", "application", "version", str),
+        ("DATAMD_ENVIRONMENT", "application", "environment", str),
+        # Feature settings
+        ("DATAMD_OCR_ENABLED", "features", "ocr_enabled", bool),
+        ("DATAMD_PDF_PROCESSING", "features", "pdf_processing", bool),
+        ("DATAMD_VIDEO_SUPPORT", "features", "video_support", bool),
+        # Limit settings
+        ("DATAMD_MAX_FILE_SIZE_MB", "limits", "max_file_size_mb", int),
+        ("DATAMD_MAX_PAGES_PDF", "limits", "max_pages_pdf", int),
+        ("DATAMD_MAX_TABLE_ROWS", "limits", "max_table_rows", int),
+        # Processing settings
+        ("DATAMD_DEFAULT_CSV_SEPARATOR", "processing", "default_csv_separator", str),
+        ("DATAMD_DEFAULT_PDF_STRATEGY", "processing", "default_pdf_strategy", str),
+        ("DATAMD_DEFAULT_OCR_LANGUAGE", "processing", "default_ocr_language", str),
+        ("DATAMD_TESSDATA_PATH", "processing", "tessdata_path", str),
+        ("DATAMD_OCR_MAX_DIMENSION", "processing", "ocr_max_dimension", int),
+        # Performance settings
+        ("DATAMD_MAX_WORKERS", "performance", "max_workers", int),
+        # Cache settings
+        ("DATAMD_REDIS_URL", "cache", "redis_url", str),
+        ("DATAMD_REDIS_TTL", "cache", "redis_ttl", int),
+        ("DATAMD_CACHE_ALLOW_PICKLE", "cache", "allow_pickle", bool),
+        # Security settings
+        (
+            "DATAMD_ALLOW_DIRECTORY_TRAVERSAL",
+            "security",
+            "allow_directory_traversal",
+            bool,
+        ),
+    )
 
     def __init__(self, config_file: Optional[str] = None):
         """
@@ -73,17 +164,51 @@ class Configuration:
             config_file (str, optional): Path to JSON configuration file
         """
         self.config_file = config_file
-        self._config = self.DEFAULTS.copy()
+        self._config: Dict[str, Any] = dict(self.DEFAULTS)
+        # key path -> resolved value (or _MISSING), cleared on every write
+        self._get_cache: Dict[str, Any] = {}
+        # Bumped on every write so callers can tell when cached results that
+        # depend on configuration have gone stale
+        self.revision = 0
         self._load_config()
 
+    def _invalidate(self):
+        """Drop memoized lookups and bump :pyattr:`revision` before a write."""
+        self._get_cache.clear()
+        self.revision += 1
+
+    def _writable_section(self, section: str) -> Dict[str, Any]:
+        """
+        Get a configuration section for modification.
+
+        Sections shared with :pyattr:`DEFAULTS` are copied on first write so
+        that instances never modify the defaults.
+
+        Args:
+            section (str): Section name
+
+        Returns:
+            dict: Section owned by this instance
+        """
+        self._invalidate()
+        values = self._config.get(section)
+        if isinstance(values, MappingProxyType):
+            values = dict(values)
+            self._config[section] = values
+        elif values is None:
+            values = {}
+            self._config[section] = values
+        return values
+
     def _load_config(self):
         """Load configuration from file and environment variables."""
         # Load from file if provided
         if self.config_file and os.path.exists(self.config_file):
             try:
-                with open(self.config_file, "r") as f:
-                    file_config = json.load(f)
+                with open(self.config_file, "rb") as f:
+                    file_config = _json_loads(f.read())
                 self._merge_config(file_config)
+            # orjson.JSONDecodeError subclasses json.JSONDecodeError
             except (json.JSONDecodeError, IOError) as e:
                 print(f"Warning: Could not load config file {self.config_file}: {e}")
 
@@ -97,11 +222,12 @@ class Configuration:
         Args:
             new_config (dict): New configuration to merge
         """
+        self._invalidate()
         for section, section_config in new_config.items():
             if section in self._config:
                 # Merge sections
                 if isinstance(section_config, dict):
-                    self._config[section].update(section_config)
+                    self._writable_section(section).update(section_config)
                 else:
                     self._config[section] = section_config
             else:
@@ -137,70 +263,24 @@ class Configuration:
         :pyattr:`DEFAULTS`.  Values are parsed into the appropriate type
         (boolean or integer) before assignment to ensure consistency.
         """
-        # Application settings
-        env_app_name = os.environ.get("DATAMD_APP_NAME")
-        if env_app_name:
-            self._config["application"]["name"] = env_app_name
-
-        env_app_version = os.environ.get("DATAMD_APP_VERSION")
-        if env_app_version:
-            self._config["application"]["version"] = env_app_version
-
-        env_environment = os.environ.get("DATAMD_ENVIRONMENT")
-        if env_environment:
-            self._config["application"]["environment"] = env_environment
-
-        # Feature settings
-        env_ocr_enabled = os.environ.get("DATAMD_OCR_ENABLED")
-        if env_ocr_enabled is not None:
-            self._config["features"]["ocr_enabled"] = self._parse_bool(env_ocr_enabled)
-
-        env_pdf_processing = os.environ.get("DATAMD_PDF_PROCESSING")
-        if env_pdf_processing is not None:
-            self._config["features"]["pdf_processing"] = self._parse_bool(
-                env_pdf_processing
-            )
-
-        env_video_support = os.environ.get("DATAMD_VIDEO_SUPPORT")
-        if env_video_support is not None:
-            self._config["features"]["video_support"] = self._parse_bool(
-                env_video_support
-            )
-
-        # Limit settings
-        env_max_file_size = os.environ.get("DATAMD_MAX_FILE_SIZE_MB")
-        if env_max_file_size:
-            parsed = self._parse_int(env_max_file_size)
-            if parsed is not None:
-                self._config["limits"]["max_file_size_mb"] = parsed
-
-        env_max_pages_pdf = os.environ.get("DATAMD_MAX_PAGES_PDF")
-        if env_max_pages_pdf:
-            parsed = self._parse_int(env_max_pages_pdf)
-            if parsed is not None:
-                self._config["limits"]["max_pages_pdf"] = parsed
-
-        # Processing settings
-        env_default_csv_sep = os.environ.get("DATAMD_DEFAULT_CSV_SEPARATOR")
-        if env_default_csv_sep:
-            self._config["processing"]["default_csv_separator"] = env_default_csv_sep
-
-        env_default_pdf_strategy = os.environ.get("DATAMD_DEFAULT_PDF_STRATEGY")
-        if env_default_pdf_strategy:
-            self._config["processing"]["default_pdf_strategy"] = (
-                env_default_pdf_strategy
-            )
+        for env_var, section, key, value_type in self.ENV_OVERRIDES:
+            raw = os.environ.get(env_var)
+            if raw is None:
+                continue
+
+            if value_type is bool:
+                # Booleans are applied even when empty (parsed as False)
+                value = self._parse_bool(raw)
+            elif not raw:
+                continue
+            elif value_type is int:
+                value = self._parse_int(raw)
+                if value is None:
+                    continue
+            else:
+                value = raw
 
-        env_default_ocr_lang = os.environ.get("DATAMD_DEFAULT_OCR_LANGUAGE")
-        if env_default_ocr_lang:
-            self._config["processing"]["default_ocr_language"] = env_default_ocr_lang
-
-        # Security settings
-        env_allow_traversal = os.environ.get("DATAMD_ALLOW_DIRECTORY_TRAVERSAL")
-        if env_allow_traversal is not None:
-            self._config["security"]["allow_directory_traversal"] = self._parse_bool(
-                env_allow_traversal
-            )
+            self._writable_section(section)[key] = value
 
     def get(self, key_path: str, default: Any = None) -> Any:
         """
@@ -214,15 +294,18 @@ class Configuration:
         Returns:
             Any: Configuration value or default
         """
-        keys = key_path.split(".")
-        value = self._config
-
         try:
-            for key in keys:
-                value = value[key]
-            return value
-        except (KeyError, TypeError):
-            return default
+            value = self._get_cache[key_path]
+        except KeyError:
+            value = self._config
+            try:
+                for key in key_path.split("."):
+                    value = value[key]
+            except (KeyError, TypeError):
+                value = _MISSING
+            self._get_cache[key_path] = value
+
+        return default if value is _MISSING else value
 
     def set(self, key_path: str, value: Any):
         """
@@ -232,8 +315,12 @@ class Configuration:
             key_path (str): Dot-separated path to configuration value
             value (Any): Value to set
         """
+        self._invalidate()
         keys = key_path.split(".")
         config_section = self._config
+        if len(keys) > 1:
+            config_section = self._writable_section(keys[0])
+            keys = keys[1:]
 
         # Navigate to the parent section
         for key in keys[:-1]:
@@ -276,6 +363,10 @@ class Configuration:
         """Get maximum allowed PDF pages."""
         return self.get("limits.max_pages_pdf", 50)
 
+    def get_max_table_rows(self) -> int:
+        """Get maximum rows rendered per table (0 disables the limit)."""
+        return self.get("limits.max_table_rows", 500)
+
     def get_supported_languages(self) -> List[str]:
         """Get list of supported OCR languages."""
         return self.get("limits.supported_languages", ["eng"])
@@ -292,6 +383,14 @@ class Configuration:
         """Get default OCR language."""
         return self.get("processing.default_ocr_language", "eng")
 
+    def get_tessdata_path(self) -> str:
+        """Get the Tesseract language data directory ("" for Tesseract's own)."""
+        return self.get("processing.tessdata_path", "")
+
+    def get_ocr_max_dimension(self) -> int:
+        """Get the longest image side passed to OCR (0 keeps full size)."""
+        return self.get("processing.ocr_max_dimension", 0)
+
     def get_video_thumb_dimensions(self) -> tuple:
         """Get default video thumbnail dimensions."""
         width = self.get("processing.video_thumb_width", 320)
@@ -310,6 +409,22 @@ class Configuration:
         """Get file size threshold for switching to streaming mode in MB."""
         return self.get("performance.streaming_threshold_mb", 10)
 
+    def get_max_workers(self) -> int:
+        """Get the worker limit for parallel rendering (0 picks one automatically)."""
+        return self.get("performance.max_workers", 0)
+
+    def get_redis_url(self) -> str:
+        """Get the Redis URL for the shared cache tier ("" when disabled)."""
+        return self.get("cache.redis_url", "")
+
+    def get_redis_ttl(self) -> int:
+        """Get the seconds Redis keeps a cache entry (0 for no expiry)."""
+        return self.get("cache.redis_ttl", 86400)
+
+    def is_pickle_cache_allowed(self) -> bool:
+        """Check if cache entries may fall back to pickle."""
+        return self.get("cache.allow_pickle", True)
+
     def is_directory_traversal_allowed(self) -> bool:
         """Check if directory traversal is allowed (security setting)."""
         return self.get("security.allow_directory_traversal", False)
@@ -329,7 +444,10 @@ class Configuration:
         Returns:
             dict: Complete configuration
         """
-        return self._config.copy()
+        return {
+            section: dict(values) if isinstance(values, MappingProxyType) else values
+            for section, values in self._config.items()
+        }
 
     def save_to_file(self, filepath: str):
         """
@@ -338,15 +456,40 @@ class Configuration:
         Args:
             filepath (str): Path to save configuration file
         """
+        # Serialize first and write the result with a single call to a
+        # temporary file, then move it into place so the file is never partial
+        payload = _json_dumps(self.to_dict())
+        # A unique temporary name, so concurrent saves don't share one
+        tmp_path = None
         try:
-            with open(filepath, "w") as f:
-                json.dump(self._config, f, indent=2)
+            with tempfile.NamedTemporaryFile(
+                "wb",
+                dir=os.path.dirname(os.path.abspath(filepath)),
+                prefix=f"{os.path.basename(filepath)}.",
+                suffix=".tmp",
+                delete=False,
+            ) as f:
+                tmp_path = f.name
+                f.write(payload)
+            # Temporary files are private; keep the mode the file had
+            try:
+                mode = stat.S_IMODE(os.stat(filepath).st_mode)
+            except FileNotFoundError:
+                mode = 0o644
+            os.chmod(tmp_path, mode)
+            os.replace(tmp_path, filepath)
         except IOError as e:
+            if tmp_path is not None:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
             raise IOError(f"Could not save configuration to {filepath}: {e}")
 
 
 # Global configuration instance
 _config_instance = None
+_config_lock = threading.Lock()
 
 
 def get_config(config_file: Optional[str] = None) -> Configuration:
@@ -361,7 +504,10 @@ def get_config(config_file: Optional[str] = None) -> Configuration:
     """
     global _config_instance
     if _config_instance is None:
-        _config_instance = Configuration(config_file)
+        with _config_lock:
+            # Re-check under the lock in case another thread got here first
+            if _config_instance is None:
+                _config_instance = Configuration(config_file)
     return _config_instance
 
 
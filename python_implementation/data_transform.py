@@ -1,10 +1,308 @@
+import operator
 import re
 from typing import Any, Dict, List, Optional, Union
 
 from .exceptions import TransformError
 
+import numpy as np
 import pandas as pd
 
+# Try to import pyarrow for native substring matching
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+    pa = None
+    pc = None
+
+# Filter condition: column operator value, e.g. "age > 25", "age>25" or
+# "name contains John". Two-character operators must come before their
+# one-character prefixes so "age<=25" isn't read as "<" with value "=25".
+_FILTER_RE = re.compile(
+    r"^\s*([a-zA-Z_][a-zA-Z0-9_]*)\s*(==|!=|<=|>=|<|>|contains)\s*(.+?)\s*$"
+)
+
+# Numeric filter values, e.g. "25", "-3", "2.5", ".5" or "1e6"
+_NUMBER_RE = re.compile(r"^[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?$")
+_FLOAT_CHARS = frozenset(".eE")
+
+# Characters that give a "contains" value regex meaning in str.contains
+_REGEX_META_RE = re.compile(r"[.^$*+?{}\[\]\\|()]")
+
+
+def _contains(series: pd.Series, value: Any) -> pd.Series:
+    """Case-insensitive substring match on the string form of a column."""
+    # Plain substrings on string columns are matched with Arrow's native
+    # kernel instead of converting every value to a Python str first
+    if (
+        PYARROW_AVAILABLE
+        and isinstance(value, str)
+        and not _REGEX_META_RE.search(value)
+        and pd.api.types.is_string_dtype(series)
+    ):
+        try:
+            arr = pa.array(series, from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            pass
+        else:
+            mask = pc.fill_null(pc.match_substring(arr, value, ignore_case=True), False)
+            return pd.Series(
+                mask.to_numpy(zero_copy_only=False), index=series.index, dtype=bool
+            )
+
+    return series.astype(str).str.contains(value, case=False, na=False)
+
+
+# Filter operator -> function building a boolean mask from (column, value)
+_FILTER_OPS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    ">": operator.gt,
+    "<=": operator.le,
+    ">=": operator.ge,
+    "contains": _contains,
+}
+
+# Comparison operators applied straight to NumPy arrays for plain numeric
+# columns, skipping pandas' Series comparison machinery
+_NUMPY_FILTER_OPS = {
+    "==": np.equal,
+    "!=": np.not_equal,
+    "<": np.less,
+    ">": np.greater,
+    "<=": np.less_equal,
+    ">=": np.greater_equal,
+}
+
+# Aggregation functions accepted by DataTransformer.aggregate
+_SUPPORTED_AGG_FUNCS = frozenset(("sum", "mean", "count", "min", "max", "std"))
+
+
+def _filter_mask(
+    df: pd.DataFrame, condition: str
+) -> Optional[Union[pd.Series, np.ndarray]]:
+    """
+    Build the boolean row mask for a filter condition.
+
+    Args:
+        df (pd.DataFrame): DataFrame to filter
+        condition (str): Filter condition in format "column operator value"
+
+    Returns:
+        pd.Series or np.ndarray: Boolean mask, or None if the condition is empty
+    """
+    if not condition:
+        return None
+
+    match = _FILTER_RE.match(condition)
+    if not match:
+        raise ValueError(f"Invalid filter condition: {condition}")
+
+    column, op, value = match.groups()
+
+    # Check if column exists
+    if column not in df.columns:
+        raise ValueError(f"Column '{column}' not found in DataFrame")
+
+    # Convert value to appropriate type. Checking the pattern first avoids
+    # raising (and catching) a ValueError for every string value.
+    if _NUMBER_RE.match(value):
+        value = float(value) if _FLOAT_CHARS.intersection(value) else int(value)
+    else:
+        # Keep as string, remove quotes if present
+        value = value.strip("\"'")
+
+    # Build mask based on operator
+    series = df[column]
+    np_func = _NUMPY_FILTER_OPS.get(op)
+    if (
+        np_func is not None
+        and isinstance(value, (int, float))
+        and isinstance(series.dtype, np.dtype)
+        and series.dtype.kind in "iuf"
+    ):
+        return np_func(series.to_numpy(), value)
+
+    op_func = _FILTER_OPS.get(op)
+    if op_func is None:
+        raise ValueError(f"Unsupported operator: {op}")
+    return op_func(series, value)
+
+
+def _sort_columns(df: pd.DataFrame, columns: Union[str, List[str]]) -> List[str]:
+    """Normalize sort columns to a list and check they all exist."""
+    if isinstance(columns, str):
+        columns = [columns]
+
+    for col in columns:
+        if col not in df.columns:
+            raise ValueError(f"Column '{col}' not found in DataFrame")
+    return columns
+
+
+def _sort_limit(
+    df: pd.DataFrame, columns: Union[str, List[str]], ascending: bool, n: int
+) -> pd.DataFrame:
+    """
+    Sort by columns and keep the first n rows.
+
+    Uses a partial selection (nsmallest/nlargest, O(N log n)) instead of a full
+    sort when every sort column is numeric and free of missing values, and
+    the selected keys are distinct. That is when both approaches are
+    guaranteed to return the same rows in the same order: sort_values orders
+    ties by its sorting algorithm while nsmallest keeps them in row order.
+    """
+    columns = _sort_columns(df, columns)
+    if n <= 0:
+        raise ValueError("Limit must be a positive integer")
+
+    if all(
+        pd.api.types.is_numeric_dtype(df[col])
+        and not pd.api.types.is_bool_dtype(df[col])
+        and not df[col].hasnans
+        for col in columns
+    ):
+        top = df.nsmallest(n, columns) if ascending else df.nlargest(n, columns)
+        if len(top) and not top.duplicated(columns).any():
+            # The last key must not be shared with a row left out either
+            boundary = top[columns].iloc[-1]
+            if (df[columns] == boundary).all(axis=1).sum() == 1:
+                return top
+
+    return df.sort_values(by=columns, ascending=ascending).head(n)
+
+
+# Characters that can make a string look numeric to tabulate
+_NUMERIC_CHARS = frozenset("0123456789+-.,eE_ \t")
+_FLOAT_SPECIALS = frozenset({"inf", "infinity", "nan"})
+
+
+def _is_text(value: str) -> bool:
+    """Whether tabulate would certainly type ``value`` as a plain string."""
+    if value in ("True", "False"):
+        return False
+    if _NUMERIC_CHARS.issuperset(value):
+        return False
+    return value.strip().lower().lstrip("+-") not in _FLOAT_SPECIALS
+
+
+def _format_text_column(values: List[Any]) -> Optional[List[str]]:
+    """
+    Format a column of strings and missing values like tabulate.
+
+    Returns:
+        list or None: Cell strings, or None if the column needs tabulate
+    """
+    cells = []
+    text = False
+    for value in values:
+        if type(value) is str:
+            text = text or _is_text(value)
+            cells.append(value.strip())
+        elif value is None:
+            cells.append("")
+        elif type(value) is float and value != value:
+            cells.append("nan")
+        else:
+            return None
+    # Columns of only numbers, booleans or blanks are retyped by tabulate
+    return cells if text else None
+
+
+def _format_float_column(values: List[float]) -> List[str]:
+    """Format floats with "g" and pad them so their decimal points line up."""
+    cells = [format(value, "g") for value in values]
+    decimals = [
+        (
+            len(cell) - cell.rfind(".") - 1
+            if "." in cell
+            else len(cell) - cell.rfind("e") - 1 if "e" in cell else -1
+        )
+        for cell in cells
+    ]
+    most = max(decimals)
+    return [cell + " " * (most - d) for cell, d in zip(cells, decimals)]
+
+
+def dataframe_to_markdown(df: pd.DataFrame) -> str:
+    """
+    Render a DataFrame as a pipe table, without its index.
+
+    Produces the same text as ``df.to_markdown(index=False)`` while
+    formatting each column in one pass instead of tabulate's per-cell type
+    detection. Frames that tabulate would treat specially (nullable,
+    temporal or mixed object columns, numeric-looking strings, non-ASCII,
+    multi-line or control characters) are passed to tabulate unchanged.
+
+    Args:
+        df (pd.DataFrame): DataFrame to render
+
+    Returns:
+        str: Markdown table
+    """
+    if df.empty or isinstance(df.columns, pd.MultiIndex):
+        return df.to_markdown(index=False)
+
+    dtypes = list(df.dtypes)
+    numpy_dtypes = all(isinstance(dtype, np.dtype) for dtype in dtypes)
+    # tabulate reads df.values, which upcasts all-numeric frames to one dtype
+    common_kind = None
+    if numpy_dtypes and all(dtype.kind in "if" for dtype in dtypes):
+        common_kind = np.result_type(*dtypes).kind
+    elif numpy_dtypes and all(dtype.kind == "b" for dtype in dtypes):
+        # numpy booleans are formatted as the numbers 1 and 0
+        common_kind = "f"
+
+    headers = [str(label) for label in df.columns]
+    columns = []
+    right_aligned = []
+    for position, dtype in enumerate(dtypes):
+        values = df.iloc[:, position].tolist()
+        kind = common_kind or (dtype.kind if isinstance(dtype, np.dtype) else None)
+        if kind == "f":
+            cells = _format_float_column([float(value) for value in values])
+        elif kind == "i":
+            cells = [str(value) for value in values]
+        elif kind == "b":
+            cells = [str(value) for value in values]
+        elif kind == "O" or isinstance(dtype, pd.StringDtype):
+            cells = _format_text_column(values)
+            if cells is None:
+                return df.to_markdown(index=False)
+        else:
+            return df.to_markdown(index=False)
+        columns.append(cells)
+        right_aligned.append(kind in ("f", "i"))
+
+    text = "".join(headers) + "".join("".join(cells) for cells in columns)
+    if not (text.isascii() and text.isprintable()):
+        return df.to_markdown(index=False)
+
+    widths = [
+        max(len(header) + 2, max(map(len, cells)))
+        for header, cells in zip(headers, columns)
+    ]
+    columns = [
+        [cell.rjust(width) if right else cell.ljust(width) for cell in cells]
+        for cells, width, right in zip(columns, widths, right_aligned)
+    ]
+    header_cells = [
+        header.rjust(width) if right else header.ljust(width)
+        for header, width, right in zip(headers, widths, right_aligned)
+    ]
+    rule = "|".join(
+        "-" * (width + 1) + ":" if right else ":" + "-" * (width + 1)
+        for width, right in zip(widths, right_aligned)
+    )
+
+    lines = ["| " + " | ".join(header_cells) + " |", "|" + rule + "|"]
+    lines.extend("| " + " | ".join(row) + " |" for row in zip(*columns))
+    return "\n".join(lines)
+
 
 class DataTransformer:
     """
@@ -17,10 +315,13 @@ class DataTransformer:
         """
         Initialize DataTransformer with a DataFrame.
 
+        The DataFrame is not copied: every transformation returns a new
+        DataFrame and none of them modify their input in place.
+
         Args:
             df (pd.DataFrame): The DataFrame to transform
         """
-        self.df = df.copy()
+        self.df = df
 
     def filter(self, condition: str) -> "DataTransformer":
         """
@@ -33,55 +334,11 @@ class DataTransformer:
         Returns:
             DataTransformer: New transformer with filtered data
         """
-        if not condition:
+        mask = _filter_mask(self.df, condition)
+        if mask is None:
             return self
 
-        # Parse condition: column operator value
-        # Support simple conditions like "age > 25" or "name contains John"
-        # Also support "age>25" without spaces
-        pattern = (
-            r"^\s*([a-zA-Z_][a-zA-Z0-9_]*)\s*(==|!=|<|>|<=|>=|contains)\s*(.+?)\s*$"
-        )
-        match = re.match(pattern, condition)
-        if not match:
-            raise ValueError(f"Invalid filter condition: {condition}")
-
-        column, operator, value = match.groups()
-
-        # Check if column exists
-        if column not in self.df.columns:
-            raise ValueError(f"Column '{column}' not found in DataFrame")
-
-        # Convert value to appropriate type
-        try:
-            # Try to convert to number first
-            if "." in value:
-                value = float(value)
-            else:
-                value = int(value)
-        except ValueError:
-            # Keep as string, remove quotes if present
-            value = value.strip("\"'")
-
-        # Apply filter based on operator
-        if operator == "==":
-            filtered_df = self.df[self.df[column] == value]
-        elif operator == "!=":
-            filtered_df = self.df[self.df[column] != value]
-        elif operator == "<":
-            filtered_df = self.df[self.df[column] < value]
-        elif operator == ">":
-            filtered_df = self.df[self.df[column] > value]
-        elif operator == "<=":
-            filtered_df = self.df[self.df[column] <= value]
-        elif operator == ">=":
-            filtered_df = self.df[self.df[column] >= value]
-        elif operator == "contains":
-            filtered_df = self.df[
-                self.df[column].astype(str).str.contains(value, case=False, na=False)
-            ]
-        else:
-            raise ValueError(f"Unsupported operator: {operator}")
+        filtered_df = self.df[mask]
 
         return DataTransformer(filtered_df)
 
@@ -98,14 +355,7 @@ class DataTransformer:
         Returns:
             DataTransformer: New transformer with sorted data
         """
-        if isinstance(columns, str):
-            columns = [columns]
-
-        # Check if all columns exist
-        for col in columns:
-            if col not in self.df.columns:
-                raise ValueError(f"Column '{col}' not found in DataFrame")
-
+        columns = _sort_columns(self.df, columns)
         sorted_df = self.df.sort_values(by=columns, ascending=ascending)
         return DataTransformer(sorted_df)
 
@@ -130,32 +380,46 @@ class DataTransformer:
         if group_by is None and aggregations is None:
             return self
 
-        # Handle grouping
-        if group_by is not None:
-            if isinstance(group_by, str):
-                group_by = [group_by]
-
-            # Check if all group columns exist
-            for col in group_by:
-                if col not in self.df.columns:
-                    raise ValueError(f"Column '{col}' not found in DataFrame")
-
-            grouped = self.df.groupby(group_by)
-        else:
-            grouped = self.df.groupby(lambda x: True)  # Group all rows together
-
-        # Apply aggregations
+        # Validate aggregations
+        agg_dict = None
         if aggregations is not None:
             agg_dict = {}
-            supported_funcs = {"sum", "mean", "count", "min", "max", "std"}
-
             for col, func in aggregations.items():
                 if col not in self.df.columns:
                     raise ValueError(f"Column '{col}' not found in DataFrame")
-                if func not in supported_funcs:
+                if func not in _SUPPORTED_AGG_FUNCS:
                     raise ValueError(f"Unsupported aggregation function: {func}")
                 agg_dict[col] = func
 
+        if group_by is None and self.df.empty:
+            # No rows means no group and an empty result, as before; the
+            # per-row key costs nothing here
+            aggregated_df = self.df.groupby(lambda x: True).agg(agg_dict)
+            return DataTransformer(aggregated_df.reset_index())
+
+        if group_by is None:
+            # Aggregate all rows into a single row, one reduction per column.
+            # The leading "index" column keeps the layout of the former
+            # groupby(lambda x: True).agg(...).reset_index()
+            columns = {"index": [True]}
+            for col, func in agg_dict.items():
+                columns[col] = [self.df[col].agg(func)]
+            aggregated_df = pd.DataFrame(columns)
+            return DataTransformer(aggregated_df)
+
+        # Handle grouping
+        if isinstance(group_by, str):
+            group_by = [group_by]
+
+        # Check if all group columns exist
+        for col in group_by:
+            if col not in self.df.columns:
+                raise ValueError(f"Column '{col}' not found in DataFrame")
+
+        grouped = self.df.groupby(group_by)
+
+        # Apply aggregations
+        if agg_dict is not None:
             aggregated_df = grouped.agg(agg_dict).reset_index()
         else:
             # If no aggregations specified, just return the grouped data
@@ -198,7 +462,9 @@ class DataTransformer:
         Returns:
             str: Markdown table representation
         """
-        return self.df.to_markdown(index=index)
+        if index:
+            return self.df.to_markdown(index=True)
+        return dataframe_to_markdown(self.df)
 
 
 def parse_transform_string(transform_str: str) -> List[Dict[str, Any]]:
@@ -220,8 +486,8 @@ def parse_transform_string(transform_str: str) -> List[Dict[str, Any]]:
 
     for part in parts:
         part = part.strip()
-        if ":" in part:
-            op_type, op_args = part.split(":", 1)
+        op_type, has_args, op_args = part.partition(":")
+        if has_args:
             op_type = op_type.strip().lower()
             op_args = op_args.strip()
 
@@ -277,26 +543,49 @@ def apply_transformations(df: pd.DataFrame, transform_str: str) -> pd.DataFrame:
 
     try:
         operations = parse_transform_string(transform_str)
-        transformer = DataTransformer(df)
+        n_ops = len(operations)
+        i = 0
 
-        for op in operations:
+        # Operate on the DataFrame directly so the pipeline doesn't create an
+        # intermediate DataTransformer per step
+        while i < n_ops:
+            op = operations[i]
             op_type = op["type"]
             if op_type == "filter":
-                transformer = transformer.filter(op["condition"])
+                # Combine consecutive filters into a single boolean mask
+                mask = None
+                while i < n_ops and operations[i]["type"] == "filter":
+                    op_mask = _filter_mask(df, operations[i]["condition"])
+                    if op_mask is not None:
+                        mask = op_mask if mask is None else mask & op_mask
+                    i += 1
+                if mask is not None:
+                    df = df[mask]
+                continue
             elif op_type == "sort":
                 columns = op["columns"]
                 if columns is None:
-                    transformer = transformer.sort(list(transformer.df.columns))
-                else:
-                    transformer = transformer.sort(columns, op.get("ascending", True))
+                    columns = list(df.columns)
+                ascending = op.get("ascending", True)
+
+                # Fuse sort followed by limit into a single top-n selection
+                if i + 1 < n_ops and operations[i + 1]["type"] == "limit":
+                    df = _sort_limit(df, columns, ascending, operations[i + 1]["n"])
+                    i += 2
+                    continue
+
+                df = df.sort_values(by=_sort_columns(df, columns), ascending=ascending)
             elif op_type == "limit":
-                transformer = transformer.limit(op["n"])
+                if op["n"] <= 0:
+                    raise ValueError("Limit must be a positive integer")
+                df = df.head(op["n"])
             elif op_type == "groupby":
                 # Groupby not yet supported in this implementation
                 raise ValueError("Groupby operation is not supported yet")
             else:
                 raise ValueError(f"Unsupported transformation operation: {op_type}")
+            i += 1
 
-        return transformer.get_dataframe()
+        return df
     except ValueError as exc:
         raise TransformError(str(exc)) from exc
@@ -1,12 +1,23 @@
+import atexit
 import json
 import os
 import re
+import shutil
+import subprocess
 import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache, partial
+from html import escape
+from itertools import islice, repeat
 from pathlib import Path
 
 # Add the parent directory to the path for direct execution
 sys.path.insert(0, os.path.join(os.path.dirname(__file__)))
 
+import numpy as np
 import pandas as pd
 import pdfplumber
 import pytesseract
@@ -23,35 +34,139 @@ except ImportError:
     MOVIEPY_AVAILABLE = False
     VideoFileClip = None
 
+# Try to import pyarrow for multi-threaded CSV parsing
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+    pa = None
+    pa_csv = None
+
+# Try to import ijson for streaming large JSON arrays
+try:
+    import ijson
+
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+    ijson = None
+
+# Try to import orjson - faster JSON serialization
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
+
+# Try to import tesserocr - keeps Tesseract loaded instead of spawning a
+# process per image like pytesseract
+try:
+    import tesserocr
+
+    TESSEROCR_AVAILABLE = True
+except ImportError:
+    TESSEROCR_AVAILABLE = False
+    tesserocr = None
+
+# Try to import PyMuPDF - much faster than pdfplumber for plain text
+try:
+    import pymupdf
+
+    PYMUPDF_AVAILABLE = True
+except ImportError:
+    PYMUPDF_AVAILABLE = False
+    pymupdf = None
+
+# Try to import OpenCV - binarizes images before OCR
+try:
+    import cv2
+
+    CV2_AVAILABLE = True
+except ImportError:
+    CV2_AVAILABLE = False
+    cv2 = None
+
+# Try to import python-calamine - a Rust reader for every spreadsheet format,
+# usable as a pandas engine from pandas 2.2
+try:
+    import python_calamine  # noqa: F401
+
+    CALAMINE_AVAILABLE = tuple(map(int, pd.__version__.split(".")[:2])) >= (2, 2)
+except ImportError:
+    CALAMINE_AVAILABLE = False
+
 # Try to import matplotlib for chart generation
 try:
     import matplotlib
-    import matplotlib.pyplot as plt
 
-    # Use non-interactive backend for server environments
+    # Use non-interactive backend for server environments; select it before
+    # anything (pandas included) imports pyplot so no GUI backend is probed
     matplotlib.use("Agg")
+    from matplotlib.figure import Figure
+
     MATPLOTLIB_AVAILABLE = True
 except ImportError:
     MATPLOTLIB_AVAILABLE = False
-    plt = None
+    Figure = None
 
 # Import configuration, data transformation, and caching
 try:
     from .cache import get_cache_manager
     from .config import get_config
-    from .data_transform import apply_transformations
+    from .data_transform import apply_transformations, dataframe_to_markdown
     from .exceptions import FileResolutionError, ShortcodeError
 except (ImportError, ValueError):  # pragma: no cover
     # When running directly
     from cache import get_cache_manager
-    from data_transform import apply_transformations
+    from data_transform import apply_transformations, dataframe_to_markdown
     from exceptions import FileResolutionError, ShortcodeError
 
     from config import get_config
 
 # Get configuration and cache manager instances
 config = get_config()
-cache_manager = get_cache_manager()
+cache_manager = get_cache_manager(
+    redis_url=config.get_redis_url() or None,
+    redis_ttl=config.get_redis_ttl(),
+    allow_pickle=config.is_pickle_cache_allowed(),
+    # Files big enough to be streamed or previewed aren't read in full just
+    # to build a cache key
+    full_hash_max_bytes=config.get_streaming_threshold_mb() * 1024 * 1024,
+)
+
+# Feature flags rarely change after startup; they are read once and re-read
+# only after a configuration write bumps config.revision.
+_feature_flags = {}
+_feature_flags_revision = None
+
+
+def refresh_feature_flags():
+    """Forget cached feature flags so the next check reads the configuration."""
+    global _feature_flags_revision
+    _feature_flags.clear()
+    _feature_flags_revision = None
+
+
+def _feature_enabled(feature):
+    """Cached equivalent of ``config.is_feature_enabled(feature)``."""
+    global _feature_flags_revision
+    if _feature_flags_revision != config.revision:
+        _feature_flags.clear()
+        _feature_flags_revision = config.revision
+    try:
+        return _feature_flags[feature]
+    except KeyError:
+        enabled = _feature_flags[feature] = config.is_feature_enabled(feature)
+        return enabled
+
+
+# Shortcode pattern: {{ command "file" arg1 arg2 }}
+_SHORTCODE_RE = re.compile(r'\{\{\s*(\w+)\s+"([^"]+)"(?:\s+([^}]*))?\s*\}\}')
 
 
 def resolve_secure_path(file_path, base_dir=None):
@@ -119,6 +234,16 @@ def sanitize_numeric_input(value, min_val=None, max_val=None, default=None):
     Returns:
         float or int: Sanitized numeric value, or default if invalid
     """
+    try:
+        return _sanitize_numeric(value, min_val, max_val, default)
+    except TypeError:
+        # Unhashable arguments can't be memoized, and aren't numbers either
+        return default
+
+
+@lru_cache(maxsize=1024)
+def _sanitize_numeric(value, min_val, max_val, default):
+    """Memoized body of :func:`sanitize_numeric_input`."""
     if not value:
         return default
 
@@ -140,6 +265,10 @@ def sanitize_numeric_input(value, min_val=None, max_val=None, default=None):
         return default
 
 
+_TRUE_VALUES = frozenset(("true", "1", "yes", "on", "enabled"))
+_FALSE_VALUES = frozenset(("false", "0", "no", "off", "disabled"))
+
+
 def sanitize_boolean_input(value, default=False):
     """
     Sanitize boolean input.
@@ -155,15 +284,33 @@ def sanitize_boolean_input(value, default=False):
         return default
 
     # If value is provided, check if it's in the true values list
-    if value.lower() in ("true", "1", "yes", "on", "enabled"):
+    value = value.lower()
+    if value in _TRUE_VALUES:
         return True
-    elif value.lower() in ("false", "0", "no", "off", "disabled"):
+    elif value in _FALSE_VALUES:
         return False
     else:
         # If it's not a recognized boolean value, return the default
         return default
 
 
+class _KeepCharsTable(dict):
+    """str.translate table that deletes every character not in a given set."""
+
+    def __init__(self, allowed_chars):
+        super().__init__((ord(c), ord(c)) for c in allowed_chars)
+
+    def __missing__(self, codepoint):
+        # Remember rejected characters so later lookups stay in C
+        self[codepoint] = None
+        return None
+
+
+@lru_cache(maxsize=64)
+def _keep_chars_table(allowed_chars):
+    return _KeepCharsTable(allowed_chars)
+
+
 def sanitize_string_input(value, max_length=1000, allowed_chars=None):
     """
     Sanitize string input with length and character constraints.
@@ -185,7 +332,11 @@ def sanitize_string_input(value, max_length=1000, allowed_chars=None):
 
     # Filter characters if specified
     if allowed_chars:
-        value = "".join(c for c in value if c in allowed_chars)
+        if isinstance(allowed_chars, str):
+            table = _keep_chars_table(allowed_chars)
+        else:
+            table = _KeepCharsTable(allowed_chars)
+        value = value.translate(table)
 
     return value
 
@@ -223,8 +374,10 @@ def sanitize_sheet_name(sheet):
     if not sheet:
         return 0
 
-    # If it's a digit, treat as index
-    if sheet.isdigit():
+    # Only plain digits are an index. int() would also accept "+1", " 1"
+    # and "1_0", which are sheet names; "-1" stays a name too, since not
+    # every Excel engine can index sheets from the end
+    if sheet.isdecimal():
         return int(sheet)
 
     # For sheet names, sanitize but allow most characters
@@ -250,6 +403,7 @@ def sanitize_strategy(strategy):
     return config.get_default_pdf_strategy()
 
 
+@lru_cache(maxsize=64)
 def sanitize_chart_type(chart_type):
     """
     Sanitize chart type for chart generation.
@@ -269,6 +423,10 @@ def sanitize_chart_type(chart_type):
     return "bar"
 
 
+# Unsigned chart option numbers: group 1 holds integers, the rest are floats
+_CHART_NUMBER_RE = re.compile(r"(\d+)|\d+\.\d*|\.\d+")
+
+
 def sanitize_chart_options(options_str):
     """
     Sanitize chart options string.
@@ -279,30 +437,144 @@ def sanitize_chart_options(options_str):
     Returns:
         dict: Dictionary of chart options
     """
+    # Copy so callers can't mutate the cached parse
+    return dict(_parse_chart_options(options_str))
+
+
+@lru_cache(maxsize=256)
+def _parse_chart_options(options_str):
+    """Parse a chart options string once per distinct value."""
     if not options_str:
         return {}
 
     options = {}
-    pairs = options_str.split(",")
-    for pair in pairs:
-        if "=" in pair:
-            key, value = pair.split("=", 1)
-            key = key.strip().lower()
-            value = value.strip()
-
-            # Convert numeric values
-            if value.isdigit():
-                value = int(value)
-            elif value.replace(".", "").isdigit():
-                value = float(value)
-            elif value.lower() in ("true", "false"):
-                value = value.lower() == "true"
-
-            options[key] = value
+    for pair in options_str.split(","):
+        key, sep, value = pair.partition("=")
+        if not sep:
+            continue
+        key = key.strip().lower()
+        value = value.strip()
+
+        # Convert numeric and boolean values
+        number = _CHART_NUMBER_RE.fullmatch(value)
+        if number:
+            value = int(value) if number.group(1) else float(value)
+        else:
+            lowered = value.lower()
+            if lowered in ("true", "false"):
+                value = lowered == "true"
+
+        options[key] = value
 
     return options
 
 
+# pandas' default missing-value markers, so both readers agree on nulls
+_CSV_NA_VALUES = (
+    "",
+    "#N/A",
+    "#N/A N/A",
+    "#NA",
+    "-1.#IND",
+    "-1.#QNAN",
+    "-NaN",
+    "-nan",
+    "1.#IND",
+    "1.#QNAN",
+    "<NA>",
+    "N/A",
+    "NA",
+    "NULL",
+    "NaN",
+    "None",
+    "n/a",
+    "nan",
+    "null",
+)
+
+
+def _arrow_csv_convert_options(column_types=None, include_columns=None):
+    return pa_csv.ConvertOptions(
+        column_types=column_types,
+        include_columns=include_columns,
+        null_values=_CSV_NA_VALUES,
+        strings_can_be_null=True,
+        true_values=["True", "TRUE", "true"],
+        false_values=["False", "FALSE", "false"],
+    )
+
+
+def _read_csv_arrow(file_path, sep, columns=None):
+    """
+    Read a CSV file with pyarrow's multi-threaded reader.
+
+    Types are kept as pandas' C engine would infer them: columns pyarrow
+    would parse as dates or times stay strings, empty columns are float and
+    booleans with missing values are objects holding NaN.
+
+    Returns:
+        pd.DataFrame or None: None if pandas should read the file instead
+    """
+    parse_options = pa_csv.ParseOptions(delimiter=sep, newlines_in_values=True)
+    try:
+        table = pa_csv.read_csv(
+            file_path,
+            parse_options=parse_options,
+            convert_options=_arrow_csv_convert_options(include_columns=columns),
+        )
+    except (pa.ArrowInvalid, pa.ArrowKeyError):
+        # e.g. ragged rows, which pandas handles differently, or a selected
+        # column that only exists under the name pandas gives it
+        return None
+
+    names = table.column_names
+    if "" in names or len(set(names)) != len(names):
+        # pandas renames blank and duplicate headers
+        return None
+
+    temporal = {
+        field.name: pa.string()
+        for field in table.schema
+        if pa.types.is_temporal(field.type)
+    }
+    if temporal:
+        table = pa_csv.read_csv(
+            file_path,
+            parse_options=parse_options,
+            convert_options=_arrow_csv_convert_options(temporal, columns),
+        )
+
+    df = table.to_pandas()
+    for field in table.schema:
+        if pa.types.is_null(field.type) and table.num_rows:
+            df[field.name] = df[field.name].astype("float64")
+        elif pa.types.is_boolean(field.type) and table.column(field.name).null_count:
+            df[field.name] = df[field.name].where(df[field.name].notna(), np.nan)
+    return df
+
+
+def _read_csv(file_path, sep=",", columns=None):
+    """
+    Read a whole CSV file into a DataFrame.
+
+    Uses pyarrow when it is installed and the separator is a single
+    character, falling back to pandas' C engine otherwise.
+
+    Args:
+        file_path (str or Path): Path to CSV file
+        sep (str): CSV separator
+        columns (list, optional): Only parse these columns
+
+    Returns:
+        pd.DataFrame: Parsed data
+    """
+    if PYARROW_AVAILABLE and len(sep) == 1:
+        df = _read_csv_arrow(file_path, sep, columns)
+        if df is not None:
+            return df
+    return pd.read_csv(file_path, sep=sep, usecols=columns)
+
+
 def read_csv_chunked(file_path, chunk_size=10000, **kwargs):
     """
     Read CSV file in chunks to reduce memory usage for large files.
@@ -322,7 +594,7 @@ def read_csv_chunked(file_path, chunk_size=10000, **kwargs):
         raise Exception(f"Error reading CSV file in chunks: {str(e)}")
 
 
-def read_excel_chunked(file_path, sheet_name=0, chunk_size=10000, engine="openpyxl"):
+def read_excel_chunked(file_path, sheet_name=0, chunk_size=10000, engine=None):
     """
     Read Excel file in chunks (simplified implementation).
 
@@ -330,11 +602,15 @@ def read_excel_chunked(file_path, sheet_name=0, chunk_size=10000, engine="openpy
         file_path (str): Path to Excel file
         sheet_name (str or int): Sheet name or index
         chunk_size (int): Number of rows per chunk
-        engine (str): Excel engine to use
+        engine (str, optional): Excel engine; picked from the file
+            extension when None
 
     Yields:
         pd.DataFrame: Chunks of the Excel file
     """
+    if engine is None:
+        engine = _excel_engine(Path(file_path).suffix[1:].lower())
+
     # For Excel, we'll read the entire file but process in chunks
     df = pd.read_excel(file_path, sheet_name=sheet_name, engine=engine)
 
@@ -343,7 +619,49 @@ def read_excel_chunked(file_path, sheet_name=0, chunk_size=10000, engine="openpy
         yield df.iloc[i : i + chunk_size]
 
 
-def process_csv_streaming(file_path, sep=",", transform="", chunk_size=10000):
+def _stream_markdown(chunks, transform, max_rows):
+    """
+    Render DataFrame chunks as Markdown tables, up to a row limit.
+
+    Chunks past the limit are still read, and transformed, to count the
+    total rows for the truncation note, but are not rendered.
+
+    Args:
+        chunks (iterable): DataFrame chunks
+        transform (str): Transformation string applied to each chunk
+        max_rows (int): Rows to render in total, or 0 for no limit
+
+    Yields:
+        str: Markdown for each rendered chunk; the last one carries the
+        truncation note when rows were left out
+    """
+    shown = 0
+    total = 0
+    tail = None
+    for chunk in chunks:
+        # Apply transformations if specified
+        if transform:
+            chunk = apply_transformations(chunk, transform)
+        total += len(chunk)
+        if tail is not None:
+            continue
+        if max_rows and shown + len(chunk) > max_rows:
+            tail = chunk.head(max_rows - shown)
+            continue
+        shown += len(chunk)
+        yield dataframe_to_markdown(chunk)
+
+    if tail is not None:
+        note = f"Showing first {max_rows} rows. Total rows: {total}"
+        if len(tail):
+            yield _noted_markdown(tail, note)
+        else:
+            yield f"*Note: {note}*"
+
+
+def process_csv_streaming(
+    file_path, sep=",", transform="", chunk_size=10000, max_rows=0
+):
     """
     Process CSV files in streaming fashion with chunked reading.
 
@@ -352,22 +670,23 @@ def process_csv_streaming(file_path, sep=",", transform="", chunk_size=10000):
         sep (str): CSV separator
         transform (str): Transformation string
         chunk_size (int): Number of rows per chunk
+        max_rows (int): Rows to render in total, or 0 for no limit
 
     Yields:
         str: Processed chunk as markdown
     """
     try:
-        for chunk in read_csv_chunked(file_path, chunk_size=chunk_size, sep=sep):
-            # Apply transformations if specified
-            if transform:
-                chunk = apply_transformations(chunk, transform)
-            yield chunk.to_markdown(index=False)
+        yield from _stream_markdown(
+            read_csv_chunked(file_path, chunk_size=chunk_size, sep=sep),
+            transform,
+            max_rows,
+        )
     except Exception as e:
         raise Exception(f"Error processing CSV file in streaming mode: {str(e)}")
 
 
 def process_excel_streaming(
-    file_path, sheet_name=0, transform="", chunk_size=10000, engine="openpyxl"
+    file_path, sheet_name=0, transform="", chunk_size=10000, engine=None, max_rows=0
 ):
     """
     Process Excel files in streaming fashion.
@@ -377,23 +696,39 @@ def process_excel_streaming(
         sheet_name (str or int): Sheet name or index
         transform (str): Transformation string
         chunk_size (int): Number of rows per chunk
-        engine (str): Excel engine to use
+        engine (str, optional): Excel engine; picked from the file
+            extension when None
+        max_rows (int): Rows to render in total, or 0 for no limit
 
     Yields:
         str: Processed chunk as markdown
     """
     try:
-        for chunk in read_excel_chunked(
-            file_path, sheet_name=sheet_name, chunk_size=chunk_size, engine=engine
-        ):
-            # Apply transformations if specified
-            if transform:
-                chunk = apply_transformations(chunk, transform)
-            yield chunk.to_markdown(index=False)
+        yield from _stream_markdown(
+            read_excel_chunked(
+                file_path, sheet_name=sheet_name, chunk_size=chunk_size, engine=engine
+            ),
+            transform,
+            max_rows,
+        )
     except Exception as e:
         raise Exception(f"Error processing Excel file in streaming mode: {str(e)}")
 
 
+def _noted_markdown(df, note):
+    """
+    Render a DataFrame as Markdown followed by an italic note paragraph.
+
+    Args:
+        df (pandas.DataFrame): DataFrame to render
+        note (str): Note text, without the surrounding asterisks
+
+    Returns:
+        str: Markdown table and note
+    """
+    return "\n\n".join((dataframe_to_markdown(df), f"*Note: {note}*"))
+
+
 def process_large_csv(file_path, sep=",", transform="", max_memory_mb=100):
     """
     Process large CSV files with memory optimization.
@@ -423,16 +758,12 @@ def process_large_csv(file_path, sep=",", transform="", max_memory_mb=100):
         # Here we'll show the first few rows as a preview
         if len(first_chunk) > 100:
             # Show only first 100 rows for large files
-            preview_df = first_chunk.head(100)
-            markdown_result = preview_df.to_markdown(index=False)
-            markdown_result += (
-                f"\n\n*Note: Large file detected. Showing first 100 rows. "
-                f"Total rows: {len(first_chunk)}*"
+            return _noted_markdown(
+                first_chunk.head(100),
+                f"Large file detected. Showing first 100 rows. "
+                f"Total rows: {len(first_chunk)}",
             )
-        else:
-            markdown_result = first_chunk.to_markdown(index=False)
-
-        return markdown_result
+        return dataframe_to_markdown(first_chunk)
     except StopIteration:
         # Empty file
         return "Empty CSV file"
@@ -441,7 +772,7 @@ def process_large_csv(file_path, sep=",", transform="", max_memory_mb=100):
 
 
 def process_large_excel(
-    file_path, sheet_name=0, transform="", engine="openpyxl", max_memory_mb=100
+    file_path, sheet_name=0, transform="", engine=None, max_memory_mb=100
 ):
     """
     Process large Excel files with memory optimization.
@@ -450,7 +781,8 @@ def process_large_excel(
         file_path (str): Path to Excel file
         sheet_name (str or int): Sheet name or index
         transform (str): Transformation string
-        engine (str): Excel engine to use
+        engine (str, optional): Excel engine; picked from the file
+            extension when None
         max_memory_mb (int): Maximum memory usage in MB
 
     Returns:
@@ -469,16 +801,12 @@ def process_large_excel(
         # For large files, show a preview
         if len(first_chunk) > 100:
             # Show only first 100 rows for large files
-            preview_df = first_chunk.head(100)
-            markdown_result = preview_df.to_markdown(index=False)
-            markdown_result += (
-                f"\n\n*Note: Large file detected. Showing first 100 rows. "
-                f"Total rows: {len(first_chunk)}*"
+            return _noted_markdown(
+                first_chunk.head(100),
+                f"Large file detected. Showing first 100 rows. "
+                f"Total rows: {len(first_chunk)}",
             )
-        else:
-            markdown_result = first_chunk.to_markdown(index=False)
-
-        return markdown_result
+        return dataframe_to_markdown(first_chunk)
     except StopIteration:
         # Empty file
         return "Empty Excel file"
@@ -486,928 +814,1483 @@ def process_large_excel(
         raise Exception(f"Error processing large Excel file: {str(e)}")
 
 
+def _transform_arg(args):
+    """
+    Get the sanitized transformation string from shortcode arguments.
+
+    Everything after the first argument is the transformation; most
+    shortcodes have none, which returns without any string work.
+
+    Args:
+        args (tuple): Shortcode arguments
+
+    Returns:
+        str: Transformation string, or "" when there is none
+    """
+    if len(args) < 2:
+        return ""
+    value = args[1] if len(args) == 2 else " ".join(args[1:])
+    return sanitize_string_input(value, max_length=1000)
+
+
+def _read_transformed(secure_path, read, transform, **cache_key):
+    """
+    Read a DataFrame and apply a transformation.
+
+    The untransformed frame is cached under the same key a shortcode without
+    a transformation uses, so each further transformation of the file skips
+    parsing it again.
+
+    Args:
+        secure_path (Path): Source file
+        read (callable): Reads the untransformed DataFrame
+        transform (str): Transformation string
+        **cache_key: Cache parameters other than the transformation
+
+    Returns:
+        pd.DataFrame: Transformed data
+    """
+    if not transform:
+        return read()
+    df = cache_manager.get(str(secure_path), transform="", **cache_key)
+    if not isinstance(df, pd.DataFrame):
+        df = read()
+        cache_manager.set(str(secure_path), df, transform="", **cache_key)
+    return apply_transformations(df, transform)
+
+
+def _table_markdown(df):
+    """
+    Render a DataFrame as Markdown, truncated to the configured row limit.
+
+    Args:
+        df (pandas.DataFrame): DataFrame to render
+
+    Returns:
+        str: Markdown table, with a note when rows were left out
+    """
+    max_rows = config.get_max_table_rows()
+    if max_rows and len(df) > max_rows:
+        return _noted_markdown(
+            df.head(max_rows), f"Showing first {max_rows} rows. Total rows: {len(df)}"
+        )
+    return dataframe_to_markdown(df)
+
+
+def _handle_csv(secure_path, args):
+    """Render a CSV file as a Markdown table."""
+    sep = sanitize_string_input(
+        args[0] if args else config.get_default_csv_separator(),
+        max_length=10,
+    )
+    transform = _transform_arg(args)
+
+    # Check file size for large file handling
+    file_size_mb = secure_path.stat().st_size / (1024 * 1024)
+    max_file_size_mb = config.get_max_file_size_mb()
+    streaming_threshold_mb = config.get_streaming_threshold_mb()
+    # Streamed tables are cached as rendered, row limit included
+    max_rows = config.get_max_table_rows()
+
+    # Try to get from cache first
+    df = cache_manager.get(
+        str(secure_path), sep=sep, transform=transform, max_rows=max_rows
+    )
+
+    if df is None:
+        if file_size_mb > max_file_size_mb:
+            # Use large file processing
+            df = process_large_csv(
+                str(secure_path),
+                sep=sep,
+                transform=transform,
+                max_memory_mb=max_file_size_mb,
+            )
+        elif file_size_mb > streaming_threshold_mb:
+            # Use streaming processing for medium-sized files
+            chunk_size = config.get_chunk_size()
+            streaming_result = []
+            for chunk_md in process_csv_streaming(
+                str(secure_path),
+                sep=sep,
+                transform=transform,
+                chunk_size=chunk_size,
+                max_rows=max_rows,
+            ):
+                # Separator between chunks
+                streaming_result.extend((chunk_md, "\n---\n"))
+
+            if streaming_result:
+                # Remove the last separator
+                streaming_result.pop()
+                df = "\n".join(streaming_result)
+            else:
+                df = "Empty CSV file"
+        else:
+            # Normal processing for small files
+            df = _read_transformed(
+                secure_path,
+                partial(_read_csv, secure_path, sep=sep),
+                transform,
+                sep=sep,
+                max_rows=max_rows,
+            )
+        # Cache the result
+        cache_manager.set(
+            str(secure_path), df, sep=sep, transform=transform, max_rows=max_rows
+        )
+
+    # Handle string result from large file processing
+    if isinstance(df, str):
+        return [df]
+    return [_table_markdown(df)]
+
+
+def _read_json_records(file_path, batch_size=10000):
+    """
+    Stream a JSON array of records into a DataFrame with ijson.
+
+    Records are normalized in batches, so the parsed Python objects for the
+    whole file never exist at once.
+
+    Args:
+        file_path (str or Path): Path to JSON file
+        batch_size (int): Number of records normalized at a time
+
+    Returns:
+        pd.DataFrame or None: None if the top-level value is not an array
+    """
+    with open(file_path, "rb") as f:
+        if f.read(64).lstrip()[:1] != b"[":
+            return None
+        f.seek(0)
+
+        frames = []
+        items = ijson.items(f, "item", use_float=True)
+        while batch := list(islice(items, batch_size)):
+            frames.append(pd.json_normalize(batch))
+
+    if not frames:
+        return pd.json_normalize([])
+    if len(frames) == 1:
+        return frames[0]
+    return pd.concat(frames, ignore_index=True)
+
+
+def _preview_json_records(file_path, rows=100, batch_size=10000):
+    """
+    Preview a JSON array of records without keeping it in memory.
+
+    Only the first rows are kept; later batches are normalized just to
+    count records and contribute their columns and dtypes, so the preview
+    matches the head of the fully normalized array.
+
+    Args:
+        file_path (str or Path): Path to JSON file
+        rows (int): Number of records to keep
+        batch_size (int): Number of records normalized at a time
+
+    Returns:
+        tuple or None: (preview DataFrame, total records), or None if the
+        top-level value is not an array
+    """
+    with open(file_path, "rb") as f:
+        if f.read(64).lstrip()[:1] != b"[":
+            return None
+        f.seek(0)
+
+        frames = []
+        total = 0
+        items = ijson.items(f, "item", use_float=True)
+        while batch := list(islice(items, batch_size)):
+            frame = pd.json_normalize(batch)
+            # Past the preview, empty frames still take part in column and
+            # dtype resolution
+            frames.append(frame.head(max(rows - total, 0)))
+            total += len(batch)
+
+    if not frames:
+        return pd.json_normalize([]), 0
+    if len(frames) == 1:
+        return frames[0], total
+    return pd.concat(frames, ignore_index=True), total
+
+
+def _json_preview_markdown(preview_df, total):
+    """Render the preview table shown for large JSON record arrays."""
+    return _noted_markdown(
+        preview_df,
+        f"Large JSON file detected. Showing first {len(preview_df)} records. "
+        f"Total records: {total}",
+    )
+
+
+# Floats that json.dumps writes with an exponent come out of orjson as
+# "1e16" or "0.00001". A literal first character keeps the search fast.
+_ORJSON_EXPONENT_RE = re.compile(rb"e[-\d]")
+
+
+def _json_code_block(data):
+    """
+    Pretty-print JSON data in a fenced code block.
+
+    orjson is used when its output is exactly what json.dumps(indent=2)
+    gives: ASCII only, no exponent-form floats and no NaN or infinity
+    (which orjson writes as null).
+
+    Args:
+        data: Parsed JSON value
+
+    Returns:
+        str: Markdown code block
+    """
+    if ORJSON_AVAILABLE:
+        try:
+            dumped = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+        except TypeError:
+            # e.g. integers beyond 64 bits
+            dumped = None
+        if (
+            dumped is not None
+            and dumped.isascii()
+            and not _ORJSON_EXPONENT_RE.search(dumped)
+            and b".0000" not in dumped
+            and (b"null" not in dumped or orjson.loads(dumped) == data)
+        ):
+            return "```json\n" + dumped.decode() + "\n```"
+    return "```json\n" + json.dumps(data, indent=2) + "\n```"
+
+
+# Maps every digit to b"0" and everything else to a space, so a run of 19+
+# digits (an integer that may not fit in 64 bits) becomes a substring search.
+_DIGIT_RUNS = bytes(48 if 48 <= i <= 57 else 32 for i in range(256))
+_LONG_DIGIT_RUN = b"0" * 19
+# Bytes translated at a time, so the scan doesn't copy the whole document
+_DIGIT_SCAN_WINDOW = 1 << 20
+
+
+def _has_long_digit_run(raw):
+    """
+    Check whether a document holds a run of 19 or more ASCII digits.
+
+    The document is translated one window at a time; windows overlap by one
+    byte less than the run, so runs across a window edge are still found.
+    A regex search is over ten times slower than this.
+    """
+    overlap = len(_LONG_DIGIT_RUN) - 1
+    for start in range(0, len(raw), _DIGIT_SCAN_WINDOW):
+        window = raw[max(0, start - overlap) : start + _DIGIT_SCAN_WINDOW]
+        if _LONG_DIGIT_RUN in window.translate(_DIGIT_RUNS):
+            return True
+    return False
+
+
+def _load_json(file_path):
+    """
+    Parse a JSON file.
+
+    With orjson the raw bytes are parsed directly, skipping the decode into
+    a Python string that json.load needs. Documents orjson would read
+    differently or rejects (integers beyond 64 bits, which it turns into
+    floats, NaN or Infinity literals, invalid UTF-8) go to json.load.
+
+    Args:
+        file_path: Path to the JSON file
+
+    Returns:
+        Parsed JSON value
+    """
+    if ORJSON_AVAILABLE:
+        with open(file_path, "rb") as f:
+            raw = f.read()
+        if not _has_long_digit_run(raw):
+            try:
+                return orjson.loads(raw)
+            except orjson.JSONDecodeError:
+                pass
+    with open(file_path, "r") as f:
+        return json.load(f)
+
+
+def _handle_json(secure_path, args):
+    """Render a JSON file as a Markdown table or fenced code block."""
+    flatten = sanitize_boolean_input(args[0] if args else False)
+    transform = _transform_arg(args)
+
+    # Check file size for large file handling
+    file_size_mb = secure_path.stat().st_size / (1024 * 1024)
+    max_file_size_mb = config.get_max_file_size_mb()
+    # The rendered table is cached, so the row limit is part of the key
+    max_rows = config.get_max_table_rows()
+
+    # Try to get from cache first
+    result = cache_manager.get(
+        str(secure_path), flatten=flatten, transform=transform, max_rows=max_rows
+    )
+
+    if result is None:
+        preview = None
+        if IJSON_AVAILABLE and file_size_mb > max_file_size_mb and not transform:
+            # An untransformed preview only needs the first rows and a count
+            preview = _preview_json_records(secure_path, 100, config.get_chunk_size())
+        if preview is not None and preview[1] > 1000:
+            result = _json_preview_markdown(*preview)
+        else:
+            df = None
+            if IJSON_AVAILABLE and file_size_mb > config.get_streaming_threshold_mb():
+                # Stream arrays of records instead of loading the whole file
+                df = _read_json_records(secure_path, config.get_chunk_size())
+            if df is None:
+                data = _load_json(secure_path)
+                if isinstance(data, list):
+                    df = pd.json_normalize(data)
+
+            if df is not None:
+                # Apply transformations if specified
+                if transform:
+                    df = apply_transformations(df, transform)
+                # For large files, show preview
+                if file_size_mb > max_file_size_mb and len(df) > 1000:
+                    result = _json_preview_markdown(df.head(100), len(df))
+                else:
+                    result = _table_markdown(df)
+            elif isinstance(data, dict):
+                if flatten:
+                    df = pd.json_normalize([data])
+                    # Apply transformations if specified
+                    if transform:
+                        df = apply_transformations(df, transform)
+                    result = _table_markdown(df)
+                else:
+                    result = _json_code_block(data)
+            else:
+                result = f"JSON content: {data}"
+        # Cache the result
+        cache_manager.set(
+            str(secure_path),
+            result,
+            flatten=flatten,
+            transform=transform,
+            max_rows=max_rows,
+        )
+
+    return [result]
+
+
+_EXCEL_ENGINES = {"xlsx": "openpyxl", "xlsm": "openpyxl", "xls": "xlrd", "ods": "odf"}
+
+
+def _excel_engine(fmt):
+    """
+    Pick the pandas engine for a spreadsheet format.
+
+    Args:
+        fmt (str): File format, e.g. "xlsx"
+
+    Returns:
+        str or None: "calamine" when available, otherwise the format's own
+        engine (None lets pandas pick for unknown formats)
+    """
+    return "calamine" if CALAMINE_AVAILABLE else _EXCEL_ENGINES.get(fmt)
+
+
+def _handle_excel(secure_path, args, cmd="xlsx"):
+    """Render a spreadsheet sheet as a Markdown table."""
+    # Check if this format is enabled
+    if not _feature_enabled("excel_support"):
+        raise ShortcodeError("Excel processing is disabled")
+
+    sheet = sanitize_sheet_name(args[0] if args else 0)
+    transform = _transform_arg(args)
+    engine = _excel_engine(cmd)
+
+    # Check file size for large file handling
+    file_size_mb = secure_path.stat().st_size / (1024 * 1024)
+    max_file_size_mb = config.get_max_file_size_mb()
+    streaming_threshold_mb = config.get_streaming_threshold_mb()
+    # Streamed tables are cached as rendered, row limit included
+    max_rows = config.get_max_table_rows()
+
+    # Try to get from cache first
+    df = cache_manager.get(
+        str(secure_path),
+        sheet=sheet,
+        engine=engine,
+        transform=transform,
+        max_rows=max_rows,
+    )
+
+    if df is None:
+        if file_size_mb > max_file_size_mb:
+            # Use large file processing
+            df = process_large_excel(
+                str(secure_path),
+                sheet_name=sheet,
+                transform=transform,
+                engine=engine,
+                max_memory_mb=max_file_size_mb,
+            )
+        elif file_size_mb > streaming_threshold_mb:
+            # Use streaming processing for medium-sized files
+            chunk_size = config.get_chunk_size()
+            streaming_result = []
+            for chunk_md in process_excel_streaming(
+                str(secure_path),
+                sheet_name=sheet,
+                transform=transform,
+                chunk_size=chunk_size,
+                engine=engine,
+                max_rows=max_rows,
+            ):
+                # Separator between chunks
+                streaming_result.extend((chunk_md, "\n---\n"))
+
+            if streaming_result:
+                # Remove the last separator
+                streaming_result.pop()
+                df = "\n".join(streaming_result)
+            else:
+                df = "Empty Excel file"
+        else:
+            # Normal processing for small files
+            df = _read_transformed(
+                secure_path,
+                partial(pd.read_excel, secure_path, sheet_name=sheet, engine=engine),
+                transform,
+                sheet=sheet,
+                engine=engine,
+                max_rows=max_rows,
+            )
+        # Cache the result
+        cache_manager.set(
+            str(secure_path),
+            df,
+            sheet=sheet,
+            engine=engine,
+            transform=transform,
+            max_rows=max_rows,
+        )
+
+    # Handle string result from large file processing
+    if isinstance(df, str):
+        return [df]
+    return [_table_markdown(df)]
+
+
+# Below this many pages, process startup costs more than it saves
+_PDF_PARALLEL_MIN_PAGES = 4
+
+# Idle open documents, most recently used last, so repeated shortcodes on the
+# same file don't re-parse it. Neither library's documents are thread-safe, so
+# a handle in use is taken out of here and only one caller holds it at a time
+_PDF_HANDLES = OrderedDict()
+_PDF_HANDLES_MAX = 8
+_PDF_HANDLES_LOCK = threading.Lock()
+
+
+@atexit.register
+def _close_pdf_handles():
+    with _PDF_HANDLES_LOCK:
+        for pdf in _PDF_HANDLES.values():
+            pdf.close()
+        _PDF_HANDLES.clear()
+
+
+@contextmanager
+def _open_pdf(secure_path, opener=None):
+    """
+    Open a PDF, reusing an idle handle while the file is unchanged.
+
+    The handle belongs to the caller until the ``with`` block exits; a
+    concurrent caller for the same file opens a handle of its own. Handles
+    are closed when evicted, so callers must not close them; close
+    pdfplumber pages once done to drop their cached layout objects.
+
+    Args:
+        secure_path (Path): Path to the PDF file
+        opener (callable, optional): Library open function, pdfplumber.open
+            when None; pymupdf.open gives a PyMuPDF document
+
+    Yields:
+        Open document (pdfplumber.PDF by default)
+    """
+    opener = opener or pdfplumber.open
+    path = str(secure_path)
+    stat = secure_path.stat()
+    version = (stat.st_mtime_ns, stat.st_size)
+    key = (path, opener, version)
+    with _PDF_HANDLES_LOCK:
+        pdf = _PDF_HANDLES.pop(key, None)
+        # Drop handles for earlier versions of the file
+        stale = [
+            _PDF_HANDLES.pop(k)
+            for k in list(_PDF_HANDLES)
+            if k[0] == path and k[2] != version
+        ]
+    for old in stale:
+        old.close()
+    if pdf is None:
+        pdf = opener(path)
+    try:
+        yield pdf
+    finally:
+        with _PDF_HANDLES_LOCK:
+            if key in _PDF_HANDLES:
+                # A concurrent caller already returned a handle for this file
+                evicted = [pdf]
+            else:
+                _PDF_HANDLES[key] = pdf
+                evicted = []
+                if len(_PDF_HANDLES) > _PDF_HANDLES_MAX:
+                    evicted.append(_PDF_HANDLES.popitem(last=False)[1])
+        for old in evicted:
+            old.close()
+
+
+def _extract_pdf_page_range(path, start, stop):
+    """
+    Extract text from pages ``start`` to ``stop`` (exclusive) with pdfplumber.
+
+    Runs in a worker process, so it opens the PDF itself.
+
+    Returns:
+        list: Text of each page in the range
+    """
+    with pdfplumber.open(path, pages=range(start + 1, stop + 1)) as pdf:
+        return [page.extract_text() or "" for page in pdf.pages]
+
+
+def _iter_pdf_text(secure_path, page_num=None):
+    """
+    Extract plain text from a PDF one page at a time.
+
+    PyMuPDF is used when installed; pdfplumber runs a full layout analysis
+    and is several times slower for plain text.
+
+    Args:
+        secure_path (Path): Path to the PDF file
+        page_num (int, optional): Zero-based page index, or None for all pages
+
+    Yields:
+        str: Text of each requested page
+    """
+    if PYMUPDF_AVAILABLE:
+        with _open_pdf(secure_path, pymupdf.open) as doc:
+            pages = doc if page_num is None else [doc[page_num]]
+            for page in pages:
+                yield page.get_text()
+        return
+
+    if page_num is None:
+        with _open_pdf(secure_path) as pdf:
+            page_count = len(pdf.pages)
+            workers = min(config.get_max_workers() or os.cpu_count() or 1, page_count)
+            if page_count < _PDF_PARALLEL_MIN_PAGES or workers < 2:
+                for page in pdf.pages:
+                    text = page.extract_text() or ""
+                    page.close()
+                    yield text
+                return
+
+        # pdfminer's layout analysis is pure Python and CPU bound, so spread
+        # contiguous page ranges over worker processes
+        chunk = -(-page_count // (workers * 4))
+        starts = range(0, page_count, chunk)
+        stops = [min(start + chunk, page_count) for start in starts]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for texts in executor.map(
+                _extract_pdf_page_range, repeat(str(secure_path)), starts, stops
+            ):
+                yield from texts
+    else:
+        with _open_pdf(secure_path) as pdf:
+            if not 0 <= page_num < len(pdf.pages):
+                raise IndexError(f"page {page_num + 1} not in document")
+            page = pdf.pages[page_num]
+            text = page.extract_text() or ""
+            page.close()
+        yield text
+
+
+def _handle_pdf(secure_path, args):
+    """Extract text from a PDF, either all pages or a single page."""
+    # Check if PDF processing is enabled
+    if not _feature_enabled("pdf_processing"):
+        raise ShortcodeError("PDF processing is disabled")
+
+    pages = sanitize_string_input(args[0] if args else "all", max_length=20)
+
+    # Try to get from cache first
+    lines = cache_manager.get(str(secure_path), pages=pages)
+
+    if lines is None:
+        page_num = None
+        if pages != "all":
+            page_num = int(sanitize_numeric_input(pages, min_val=1, default=1)) - 1
+
+        # Emit each page as its own line, separated by blank lines, instead
+        # of joining every page into one string
+        lines = []
+        for text in _iter_pdf_text(secure_path, page_num):
+            text = text.strip()
+            if text:
+                lines.extend((text, ""))
+        if lines:
+            lines.pop()
+        # Cache the result
+        cache_manager.set(str(secure_path), lines, pages=pages)
+    elif isinstance(lines, str):
+        # Entry written before pages were cached as separate lines
+        lines = [lines.strip()]
+    return lines or [""]
+
+
+# pdf_table threshold arguments, e.g. "snap=3", and the settings they set
+_TABLE_TOLERANCE_RE = re.compile(r"(snap|edge|intersect)=(.+)")
+_TABLE_TOLERANCE_SETTINGS = {
+    "snap": "snap_tolerance",
+    "edge": "edge_tolerance",
+    "intersect": "intersection_tolerance",
+}
+
+
+def _find_pdf_tables(secure_path, page, table_settings):
+    """
+    Extract the tables on a PDF page with PyMuPDF.
+
+    PyMuPDF's table finder is a port of pdfplumber's and takes the same
+    settings, but runs on MuPDF's C parser instead of pdfminer.six. Settings
+    it has no equivalent for (explicit lines, edge_tolerance) and pages
+    outside the document are left to pdfplumber.
+
+    Args:
+        secure_path (Path): Path to the PDF file
+        page (int): Zero-based page index
+        table_settings (dict): pdfplumber table settings
+
+    Returns:
+        list or None: Tables as lists of rows, or None when PyMuPDF is not
+        installed or cannot handle the request
+    """
+    if (
+        not PYMUPDF_AVAILABLE
+        or "explicit" in table_settings.values()
+        or "edge_tolerance" in table_settings
+    ):
+        return None
+    # The finder otherwise prints an install suggestion to stdout
+    getattr(pymupdf, "no_recommend_layout", lambda: None)()
+    with _open_pdf(secure_path, pymupdf.open) as doc:
+        if page >= doc.page_count:
+            return None
+        found = doc[page].find_tables(**table_settings)
+        return [table.extract() for table in found.tables]
+
+
+def _handle_pdf_table(secure_path, args):
+    """Extract the tables on one PDF page as Markdown tables."""
+    # Check if PDF processing is enabled
+    if not _feature_enabled("pdf_processing"):
+        return ["Error: PDF processing is disabled"]
+
+    # Parse arguments for pdf_table
+    page = (
+        int(sanitize_numeric_input(args[0], min_val=1, default=1)) - 1
+        if args and args[0]
+        else 0
+    )
+    horizontal_strategy = sanitize_strategy(
+        args[1] if len(args) > 1 else config.get_default_pdf_strategy()
+    )
+    vertical_strategy = sanitize_strategy(
+        args[2] if len(args) > 2 else config.get_default_pdf_strategy()
+    )
+
+    # Parse threshold parameters from the remaining arguments; a later
+    # argument for the same setting wins
+    tolerances = {}
+    for arg in args[3:]:
+        match = _TABLE_TOLERANCE_RE.fullmatch(arg)
+        if match:
+            tolerances[_TABLE_TOLERANCE_SETTINGS[match.group(1)]] = (
+                sanitize_numeric_input(match.group(2), min_val=0, max_val=100)
+            )
+    snap_tolerance = tolerances.get("snap_tolerance")
+    edge_tolerance = tolerances.get("edge_tolerance")
+    intersection_tolerance = tolerances.get("intersection_tolerance")
+
+    # Prepare table settings with threshold parameters
+    table_settings = {
+        "horizontal_strategy": horizontal_strategy,
+        "vertical_strategy": vertical_strategy,
+    }
+
+    # Add threshold parameters if provided
+    for setting, value in tolerances.items():
+        if value is not None:
+            table_settings[setting] = value
+
+    # Try to get from cache first
+    tables_result = cache_manager.get(
+        str(secure_path),
+        page=page,
+        horizontal_strategy=horizontal_strategy,
+        vertical_strategy=vertical_strategy,
+        snap_tolerance=snap_tolerance,
+        edge_tolerance=edge_tolerance,
+        intersection_tolerance=intersection_tolerance,
+    )
+
+    if tables_result is None:
+        tables = _find_pdf_tables(secure_path, page, table_settings)
+        if not tables:
+            with _open_pdf(secure_path) as pdf:
+                pdf_page = pdf.pages[page]
+                # Use strategy parameters and threshold parameters
+                # for table extraction
+                tables = pdf_page.extract_tables(table_settings)
+                pdf_page.close()
+        if tables:
+            tables_result = []
+            for i, table in enumerate(tables):
+                if table and len(table) > 1:
+                    # pdfplumber cells are strings or None; an object
+                    # array lets pandas take the block as-is
+                    rows = np.asarray(table[1:], dtype=object)
+                    df = pd.DataFrame(rows, columns=table[0], copy=False)
+                    tables_result.extend(
+                        (f"### Table {i+1}", dataframe_to_markdown(df), "")
+                    )
+        else:
+            tables_result = ["No tables found on this page."]
+        # Cache the result
+        cache_manager.set(
+            str(secure_path),
+            tables_result,
+            page=page,
+            horizontal_strategy=horizontal_strategy,
+            vertical_strategy=vertical_strategy,
+            snap_tolerance=snap_tolerance,
+            edge_tolerance=edge_tolerance,
+            intersection_tolerance=intersection_tolerance,
+        )
+
+    return tables_result
+
+
+# Idle Tesseract APIs per (language data directory, language), or None when
+# tesserocr couldn't load that language. An API is not thread-safe, so each
+# call checks one out: concurrent calls from the render pool get APIs of their
+# own and recognize in parallel, as tesserocr releases the GIL while it works
+_TESS_APIS = {}
+_TESS_LOCK = threading.Lock()
+
+
+@atexit.register
+def _end_tess_apis():
+    with _TESS_LOCK:
+        for apis in _TESS_APIS.values():
+            for api in apis or ():
+                api.End()
+        _TESS_APIS.clear()
+
+
+def _ocr_image(image, lang, tessdata=""):
+    """
+    Recognize the text in an image.
+
+    Uses a cached tesserocr API when available, so each language model is
+    loaded once per concurrent caller rather than once per image, and
+    pytesseract otherwise.
+
+    Args:
+        image (PIL.Image.Image): Image to read
+        lang (str): Tesseract language code
+        tessdata (str): Language data directory, or "" for Tesseract's own
+
+    Returns:
+        str: Recognized text
+    """
+    if TESSEROCR_AVAILABLE:
+        key = (tessdata, lang)
+        with _TESS_LOCK:
+            idle = _TESS_APIS.setdefault(key, [])
+            api = idle.pop() if idle else None
+        if idle is not None:
+            if api is None:
+                try:
+                    if tessdata:
+                        api = tesserocr.PyTessBaseAPI(path=tessdata, lang=lang)
+                    else:
+                        api = tesserocr.PyTessBaseAPI(lang=lang)
+                except RuntimeError:
+                    # e.g. tesserocr can't find the language data that the
+                    # tesseract executable uses; remember that, so later
+                    # images go straight to pytesseract
+                    with _TESS_LOCK:
+                        _TESS_APIS[key] = None
+            if api is not None:
+                try:
+                    api.SetImage(image)
+                    return api.GetUTF8Text()
+                finally:
+                    with _TESS_LOCK:
+                        _TESS_APIS.setdefault(key, []).append(api)
+    if tessdata:
+        return pytesseract.image_to_string(
+            image, lang=lang, config=f'--tessdata-dir "{tessdata}"'
+        )
+    return pytesseract.image_to_string(image, lang=lang)
+
+
+def _load_ocr_image(secure_path, max_dimension=0):
+    """
+    Load an image for OCR.
+
+    With OpenCV the image is read as grayscale and Otsu-thresholded, which
+    gives Tesseract a one-byte-per-pixel binary image to work on. Formats
+    OpenCV can't decode (e.g. GIF) are loaded with PIL unchanged.
+
+    Tesseract's run time grows with the pixel count, so images whose longer
+    side exceeds ``max_dimension`` are scaled down to fit first.
+
+    Args:
+        secure_path (Path): Image file
+        max_dimension (int): Longest side in pixels, or 0 for no limit
+
+    Returns:
+        PIL.Image.Image: Image to pass to Tesseract
+    """
+    if CV2_AVAILABLE:
+        gray = cv2.imread(str(secure_path), cv2.IMREAD_GRAYSCALE)
+        if gray is not None:
+            height, width = gray.shape
+            if max_dimension and max(height, width) > max_dimension:
+                scale = max_dimension / max(height, width)
+                size = (max(1, round(width * scale)), max(1, round(height * scale)))
+                # Area averaging keeps thin strokes when shrinking
+                gray = cv2.resize(gray, size, interpolation=cv2.INTER_AREA)
+            _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+            return Image.fromarray(binary)
+    with Image.open(secure_path) as image:
+        image.load()
+        if max_dimension and max(image.size) > max_dimension:
+            image.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+        return image
+
+
+def _handle_image_ocr(secure_path, args):
+    """Run OCR on an image and return the recognized text."""
+    # Check if OCR is enabled
+    if not _feature_enabled("ocr_enabled"):
+        raise ShortcodeError("OCR processing is disabled")
+
+    lang = sanitize_language_code(
+        args[0] if args else config.get_default_ocr_language()
+    )
+
+    # Different language data or image sizes give different text, so those
+    # settings are part of the cache key when they are in use
+    tessdata = config.get_tessdata_path()
+    max_dimension = config.get_ocr_max_dimension()
+    key = {"lang": lang}
+    if tessdata:
+        key["tessdata"] = tessdata
+    if max_dimension:
+        key["max_dimension"] = max_dimension
+
+    # Try to get from cache first
+    text = cache_manager.get(str(secure_path), **key)
+
+    if text is None:
+        image = _load_ocr_image(secure_path, max_dimension)
+        text = _ocr_image(image, lang, tessdata)
+        # Cache the result
+        cache_manager.set(str(secure_path), text, **key)
+    return [text.strip()]
+
+
+_VIDEO_TAIL = (
+    '" type="video/mp4">\n'
+    "  Your browser does not support the video tag.\n"
+    "</video>"
+)
+
+
+def _handle_video(secure_path, args):
+    """Embed a video file with an HTML5 <video> element."""
+    # Check if video support is enabled
+    if not _feature_enabled("video_support"):
+        raise ShortcodeError("Video processing is disabled")
+
+    width = sanitize_numeric_input(
+        args[0] if len(args) > 0 else "640",
+        min_val=1,
+        max_val=5000,
+        default=640,
+    )
+    height = sanitize_numeric_input(
+        args[1] if len(args) > 1 else "480",
+        min_val=1,
+        max_val=5000,
+        default=480,
+    )
+    controls = sanitize_boolean_input(
+        args[2] if len(args) > 2 else "true", default=True
+    )
+    autoplay = sanitize_boolean_input(
+        args[3] if len(args) > 3 else "false", default=False
+    )
+
+    parts = ['<video width="', str(width), '" height="', str(height), '"']
+    if controls:
+        parts.append(" controls")
+    if autoplay:
+        parts.append(" autoplay")
+    parts += ['>\n  <source src="', escape(str(secure_path)), _VIDEO_TAIL]
+    return ["".join(parts)]
+
+
+@lru_cache(maxsize=None)
+def _ffmpeg_binary():
+    """
+    Locate an ffmpeg executable.
+
+    Prefers one on PATH, then the copy bundled with imageio-ffmpeg (which
+    moviepy depends on).
+
+    Returns:
+        str or None: Path to ffmpeg, or None if there is none
+    """
+    binary = shutil.which("ffmpeg")
+    if binary is None:
+        try:
+            import imageio_ffmpeg
+
+            binary = imageio_ffmpeg.get_ffmpeg_exe()
+        except (ImportError, RuntimeError):
+            pass
+    return binary
+
+
+def _ffmpeg_thumbnail(binary, secure_path, time, width, height):
+    """
+    Grab one frame of a video as PNG bytes with ffmpeg.
+
+    Seeking before the input lets ffmpeg jump to the nearest keyframe
+    instead of decoding everything up to ``time``. A missing dimension keeps
+    the aspect ratio, rounding down like the moviepy path.
+
+    Returns:
+        bytes: PNG image data
+    """
+    command = [binary, "-v", "error", "-ss", str(time), "-i", str(secure_path)]
+    if width or height:
+        if not width:
+            width = f"trunc({height}*iw/ih)"
+        elif not height:
+            height = f"trunc({width}*ih/iw)"
+        command += ["-vf", f"scale={width}:{height}"]
+    command += ["-frames:v", "1", "-f", "image2pipe", "-c:v", "png", "pipe:1"]
+    result = subprocess.run(command, capture_output=True, check=False)
+    if result.returncode or not result.stdout:
+        detail = result.stderr.decode(errors="replace").strip()
+        raise ShortcodeError(detail or f"No frame at {time}s")
+    return result.stdout
+
+
+def _handle_video_thumb(secure_path, args):
+    """Save a video frame as a PNG thumbnail and link to it."""
+    # Check if video support is enabled
+    if not _feature_enabled("video_support"):
+        raise ShortcodeError("Video processing is disabled")
+
+    # ffmpeg is used directly when present, moviepy otherwise
+    ffmpeg = _ffmpeg_binary()
+    if ffmpeg is None and not MOVIEPY_AVAILABLE:
+        raise ShortcodeError("moviepy not available for video thumbnail generation")
+
+    # Extract time parameter (required)
+    if not args:
+        raise ShortcodeError("video_thumb requires time parameter")
+
+    try:
+        time = sanitize_numeric_input(args[0], min_val=0, default=0)
+        width = sanitize_numeric_input(
+            args[1] if len(args) > 1 else None,
+            min_val=1,
+            max_val=5000,
+        )
+        height = sanitize_numeric_input(
+            args[2] if len(args) > 2 else None,
+            min_val=1,
+            max_val=5000,
+        )
+
+        # Generate thumbnail filename next to the video
+        thumb_path = secure_path.with_name(f"{secure_path.stem}_thumb_{time}s.png")
+
+        if ffmpeg is not None:
+            thumb_path.write_bytes(
+                _ffmpeg_thumbnail(ffmpeg, secure_path, time, width, height)
+            )
+            return [f"![Video Thumbnail at {time}s]({thumb_path})"]
+
+        # Generate thumbnail using moviepy
+        clip = VideoFileClip(str(secure_path))
+
+        # Extract frame at specified time
+        frame = clip.get_frame(t=time)
+
+        # Convert to PIL Image
+        image = Image.fromarray(frame)
+
+        # Resize if dimensions provided
+        if width or height:
+            if not width:
+                # Calculate width to maintain aspect ratio
+                aspect_ratio = image.width / image.height
+                width = int(height * aspect_ratio)
+            elif not height:
+                # Calculate height to maintain aspect ratio
+                aspect_ratio = image.height / image.width
+                height = int(width * aspect_ratio)
+            # Box-reduce large frames first, then filter; the default
+            # nearest-neighbour resize aliases badly on video frames
+            image = image.resize((width, height), Image.LANCZOS, reducing_gap=2.0)
+
+        # Save thumbnail
+        image.save(thumb_path, "PNG")
+
+        # Clean up
+        clip.close()
+
+        # Generate markdown image tag
+        return [f"![Video Thumbnail at {time}s]({thumb_path})"]
+
+    except Exception as e:
+        return [f"Error generating thumbnail: {str(e)}"]
+
+
+# Charts are drawn on one reused Figure rather than through pyplot; clearing
+# a figure is much cheaper than building a new one with its canvas
+_CHART_FIGURE = None
+_CHART_LOCK = threading.Lock()
+
+
+def _render_chart(df, chart_type, x_column, y_column, options, chart_path):
+    """
+    Plot a DataFrame and save the chart as a PNG.
+
+    Args:
+        df (pandas.DataFrame): Data to plot
+        chart_type (str): bar, line, pie, scatter or histogram
+        x_column (str): X column, or "" for the index
+        y_column (str): Y column, or "" for every column; histograms need one
+        options (dict): Sanitized chart options
+        chart_path (Path): Where to write the PNG
+    """
+    global _CHART_FIGURE
+
+    # Generate chart with enhanced customization
+    figsize = (options.get("width", 10), options.get("height", 6))
+
+    # Handle color parameter
+    color = options.get("color", None)
+
+    # Handle other styling options
+    alpha = options.get("alpha", 1.0)  # Transparency
+    linestyle = options.get("linestyle", "-")  # Line style for line charts
+    marker = options.get("marker", None)  # Marker for line charts
+
+    with _CHART_LOCK:
+        if _CHART_FIGURE is None:
+            _CHART_FIGURE = Figure()
+        fig = _CHART_FIGURE
+        fig.clear()
+        fig.set_size_inches(figsize)
+        ax = fig.add_subplot()
+
+        if chart_type == "bar":
+            if x_column and y_column:
+                df.plot(
+                    x=x_column, y=y_column, kind="bar", ax=ax, color=color, alpha=alpha
+                )
+            elif y_column:
+                df[y_column].plot(kind="bar", ax=ax, color=color, alpha=alpha)
+            else:
+                df.plot(kind="bar", ax=ax, color=color, alpha=alpha)
+        elif chart_type == "line":
+            style = {"linestyle": linestyle, "marker": marker}
+            if x_column and y_column:
+                df.plot(
+                    x=x_column,
+                    y=y_column,
+                    kind="line",
+                    ax=ax,
+                    color=color,
+                    alpha=alpha,
+                    **style,
+                )
+            elif y_column:
+                df[y_column].plot(kind="line", ax=ax, color=color, alpha=alpha, **style)
+            else:
+                df.plot(kind="line", ax=ax, color=color, alpha=alpha, **style)
+        elif chart_type == "pie":
+            if x_column:
+                df.plot(
+                    x=x_column, y=y_column, kind="pie", ax=ax, ylabel="", color=color
+                )
+            else:
+                df[y_column].plot(kind="pie", ax=ax, ylabel="", color=color)
+        elif chart_type == "scatter":
+            # Handle scatter plot specific options
+            s = options.get("size", 20)  # Marker size
+            df.plot(
+                x=x_column,
+                y=y_column,
+                kind="scatter",
+                ax=ax,
+                color=color,
+                alpha=alpha,
+                s=s,
+            )
+        elif chart_type == "histogram":
+            # Handle histogram specific options
+            bins = options.get("bins", 10)  # Number of bins
+            df[y_column].plot(kind="hist", ax=ax, color=color, alpha=alpha, bins=bins)
+
+        # Apply customizations from options
+        if "title" in options:
+            ax.set_title(options["title"])
+        if "xlabel" in options:
+            ax.set_xlabel(options["xlabel"])
+        if "ylabel" in options:
+            ax.set_ylabel(options["ylabel"])
+
+        # Apply grid if requested
+        if options.get("grid", False):
+            ax.grid(True)
+
+        # Save chart
+        fig.tight_layout()
+        fig.savefig(chart_path)
+        fig.clear()
+
+
+def _read_chart_data(secure_path, columns=None):
+    """
+    Read the data for a chart.
+
+    Args:
+        secure_path (Path): CSV, Excel or JSON file
+        columns (list, optional): Only read these columns from CSV and Excel
+            files; the whole file is read if any of them is missing, so
+            the usual error names the column
+
+    Returns:
+        pd.DataFrame: Chart data
+    """
+    file_ext = secure_path.suffix.lower()
+    if file_ext == ".csv":
+        if columns:
+            try:
+                return _read_csv(secure_path, columns=columns)
+            except ValueError:
+                pass
+        return _read_csv(secure_path)
+    if file_ext in [".xlsx", ".xls", ".xlsm"]:
+        engine = _excel_engine(file_ext[1:])
+        if columns:
+            try:
+                return pd.read_excel(secure_path, engine=engine, usecols=columns)
+            except ValueError:
+                pass
+        return pd.read_excel(secure_path, engine=engine)
+    if file_ext == ".json":
+        data = _load_json(secure_path)
+        return (
+            pd.json_normalize(data) if isinstance(data, list) else pd.DataFrame([data])
+        )
+    error_msg = "Unsupported file format for chart generation"
+    raise ShortcodeError(error_msg)
+
+
+@lru_cache(maxsize=16)
+def _cached_chart_data(path, mtime_ns, size, columns):
+    """
+    Memoized :func:`_read_chart_data`, so charting one file several ways
+    parses it once.
+
+    The modification time and size are only part of the key: a changed
+    file simply misses the cache. Callers must not modify the frame.
+    """
+    return _read_chart_data(Path(path), list(columns) if columns else None)
+
+
+def _handle_chart(secure_path, args):
+    """Plot tabular data with matplotlib and link to the saved PNG."""
+    # Check if matplotlib is available
+    if not MATPLOTLIB_AVAILABLE:
+        return ["Error: Chart generation requires matplotlib"]
+
+    # Parse chart arguments
+    chart_type = sanitize_chart_type(args[0] if args else "bar")
+    x_column = sanitize_string_input(args[1] if len(args) > 1 else "", max_length=100)
+    y_column = sanitize_string_input(args[2] if len(args) > 2 else "", max_length=100)
+    options_str = " ".join(args[3:]) if len(args) > 3 else ""
+    options = sanitize_chart_options(options_str)
+
+    # Generate chart filename next to the data file
+    path = str(secure_path)
+    chart_path = secure_path.with_name(f"{secure_path.stem}_chart_{chart_type}.png")
+
+    # Try to get from cache first
+    cached_chart_path = cache_manager.get(
+        path,
+        chart_type=chart_type,
+        x_column=x_column,
+        y_column=y_column,
+        options=options_str,
+    )
+
+    if cached_chart_path is None or not os.path.exists(cached_chart_path):
+        try:
+            # Read data. With a Y column only the X and Y columns are
+            # plotted, unless a transformation needs the others
+            columns = None
+            if y_column and "transform" not in options:
+                columns = list(dict.fromkeys(filter(None, (x_column, y_column))))
+            stat = secure_path.stat()
+            df = _cached_chart_data(
+                path,
+                stat.st_mtime_ns,
+                stat.st_size,
+                tuple(columns) if columns else None,
+            )
+
+            # Apply transformations if specified in options
+            if "transform" in options:
+                df = apply_transformations(df, options["transform"])
+
+            # Validate columns
+            if x_column and x_column not in df.columns:
+                error_msg = f"X column '{x_column}' not found in data"
+                raise ShortcodeError(error_msg)
+            if y_column and y_column not in df.columns:
+                error_msg = f"Y column '{y_column}' not found in data"
+                raise ShortcodeError(error_msg)
+
+            # Check the column requirements of each chart type up front
+            if chart_type == "pie" and not y_column:
+                raise ShortcodeError("Pie charts require a Y column")
+            if chart_type == "scatter" and not (x_column and y_column):
+                raise ShortcodeError("Scatter plots require both X and Y columns")
+            # Without a Y column a histogram uses the first numeric column
+            plot_column = y_column
+            if chart_type == "histogram" and not y_column:
+                numeric_columns = df.select_dtypes(include=["number"]).columns
+                if not len(numeric_columns):
+                    return ["Error: No numeric columns found for histogram"]
+                plot_column = numeric_columns[0]
+
+            _render_chart(df, chart_type, x_column, plot_column, options, chart_path)
+
+            # Cache the chart path
+            cache_manager.set(
+                path,
+                str(chart_path),
+                chart_type=chart_type,
+                x_column=x_column,
+                y_column=y_column,
+                options=options_str,
+            )
+
+            cached_chart_path = str(chart_path)
+        except ShortcodeError:
+            raise
+        except Exception as e:
+            error_msg = f"Error generating chart: {str(e)}"
+            raise ShortcodeError(error_msg) from e
+
+    # Generate markdown image tag
+    alt_text = f"{chart_type.capitalize()} chart"
+    if "title" in options:
+        alt_text = options["title"]
+    return [f"![{alt_text}]({cached_chart_path})"]
+
+
+# Map shortcode commands to their handlers. Each handler takes the resolved
+# path and the argument list and returns the lines to emit.
+_HANDLERS = {
+    "csv": _handle_csv,
+    "json": _handle_json,
+    "xlsx": partial(_handle_excel, cmd="xlsx"),
+    "xls": partial(_handle_excel, cmd="xls"),
+    "xlsm": partial(_handle_excel, cmd="xlsm"),
+    "ods": partial(_handle_excel, cmd="ods"),
+    "pdf": _handle_pdf,
+    "pdf_table": _handle_pdf_table,
+    "image_ocr": _handle_image_ocr,
+    "video": _handle_video,
+    "video_thumb": _handle_video_thumb,
+    "chart": _handle_chart,
+}
+
+# Commands whose output depends only on the file, the arguments and the
+# configuration. chart and video_thumb write files next to the source, so
+# they always run.
+_MEMOIZED_COMMANDS = frozenset(
+    {"csv", "json", "xlsx", "xls", "xlsm", "ods", "pdf", "pdf_table", "image_ocr"}
+)
+
+
+# Commands that are safe to expand on worker threads. pdf and pdf_table share
+# open documents, and chart and video_thumb drive matplotlib and moviepy, so
+# those run on the calling thread while the pool works on the rest.
+_POOLED_COMMANDS = frozenset({"csv", "json", "xlsx", "xls", "xlsm", "ods", "image_ocr"})
+# Thread count used when performance.max_workers is 0
+_MAX_RENDER_THREADS = 8
+
+
+@lru_cache(maxsize=128)
+def _render_cached(cmd, path, mtime_ns, size, args, config_revision):
+    """
+    Run a handler, memoizing its output in memory.
+
+    The modification time, size and configuration revision are only part of
+    the key: a changed file or configuration simply misses the cache.
+
+    Returns:
+        tuple: Lines emitted by the handler
+    """
+    return tuple(_HANDLERS[cmd](Path(path), args))
+
+
 class DataMDPreprocessor(Preprocessor):
     def __init__(self, md, source_path=None):
         super().__init__(md)
         self.source_path = source_path or "<unknown>"
 
     def run(self, lines):
-        new_lines = []
+        # Python-Markdown expects a list back from preprocessors
+        return list(self._iter_lines(lines))
+
+    def _iter_lines(self, lines):
+        """Yield the document lines with every shortcode expanded."""
+        # Shortcodes are anchored at the start of the line, so most lines
+        # can skip the regex entirely
+        shortcodes = {}
         for idx, line in enumerate(lines, start=1):
-            # Match shortcode pattern: {{ command "file" arg1 arg2 }}
-            match = re.match(r'\{\{\s*(\w+)\s+"([^"]+)"(?:\s+([^}]*))?\s*\}\}', line)
-            if match:
-                cmd = match.group(1)
-                file_path = match.group(2)
-                args = match.group(3).split() if match.group(3) else []
-
-                try:
-                    # Resolve the file path securely
+            if line.startswith("{{"):
+                match = _SHORTCODE_RE.match(line)
+                if match:
+                    shortcodes[idx] = match
+
+        # Paths are resolved once per render; documents often reference the
+        # same file from several shortcodes
+        resolved_paths = {}
+        pooled = [
+            idx
+            for idx, match in shortcodes.items()
+            if match.group(1) in _POOLED_COMMANDS
+        ]
+        executor = None
+        futures = {}
+        workers = min(config.get_max_workers() or _MAX_RENDER_THREADS, len(pooled))
+        if workers > 1:
+            # Resolve pooled paths here, so threads sharing a file don't each
+            # resolve it; failures are left for _expand to report in place
+            for idx in pooled:
+                file_path = shortcodes[idx].group(2)
+                if file_path not in resolved_paths:
                     try:
-                        secure_path = resolve_secure_path(file_path)
-                    except FileResolutionError as e:
-                        raise ShortcodeError(str(e)) from e
-
-                    if cmd == "csv":
-                        sep = sanitize_string_input(
-                            args[0] if args else config.get_default_csv_separator(),
-                            max_length=10,
-                        )
-                        transform = sanitize_string_input(
-                            " ".join(args[1:]) if len(args) > 1 else "", max_length=1000
-                        )
-
-                        # Check file size for large file handling
-                        file_size_mb = secure_path.stat().st_size / (1024 * 1024)
-                        max_file_size_mb = config.get_max_file_size_mb()
-                        streaming_threshold_mb = config.get_streaming_threshold_mb()
-
-                        # Try to get from cache first
-                        cache_key = f"csv:{secure_path}:{sep}:{transform}"
-                        df = cache_manager.get(
-                            str(secure_path), sep=sep, transform=transform
-                        )
-
-                        if df is None:
-                            if file_size_mb > max_file_size_mb:
-                                # Use large file processing
-                                df = process_large_csv(
-                                    str(secure_path),
-                                    sep=sep,
-                                    transform=transform,
-                                    max_memory_mb=max_file_size_mb,
-                                )
-                            elif file_size_mb > streaming_threshold_mb:
-                                # Use streaming processing for medium-sized files
-                                chunk_size = config.get_chunk_size()
-                                streaming_result = []
-                                for chunk_md in process_csv_streaming(
-                                    str(secure_path),
-                                    sep=sep,
-                                    transform=transform,
-                                    chunk_size=chunk_size,
-                                ):
-                                    streaming_result.append(chunk_md)
-                                    streaming_result.append(
-                                        "\n---\n"
-                                    )  # Separator between chunks
-
-                                if streaming_result:
-                                    # Remove the last separator
-                                    streaming_result.pop()
-                                    df = "\n".join(streaming_result)
-                                else:
-                                    df = "Empty CSV file"
-                            else:
-                                # Normal processing for small files
-                                df = pd.read_csv(secure_path, sep=sep)
-                                # Apply transformations if specified
-                                if transform:
-                                    df = apply_transformations(df, transform)
-                            # Cache the result
-                            cache_manager.set(
-                                str(secure_path), df, sep=sep, transform=transform
-                            )
-
-                        # Handle string result from large file processing
-                        if isinstance(df, str):
-                            new_lines.append(df)
-                        else:
-                            new_lines.append(df.to_markdown(index=False))
-
-                    elif cmd == "json":
-                        flatten = sanitize_boolean_input(args[0] if args else False)
-                        transform = sanitize_string_input(
-                            " ".join(args[1:]) if len(args) > 1 else "", max_length=1000
-                        )
-
-                        # Check file size for large file handling
-                        file_size_mb = secure_path.stat().st_size / (1024 * 1024)
-                        max_file_size_mb = config.get_max_file_size_mb()
-
-                        # Try to get from cache first
-                        cache_key = f"json:{secure_path}:{flatten}:{transform}"
-                        result = cache_manager.get(
-                            str(secure_path), flatten=flatten, transform=transform
-                        )
-
-                        if result is None:
-                            if file_size_mb > max_file_size_mb:
-                                # For large JSON files, we might want to implement
-                                # streaming. For now, we'll just add a warning
-                                with open(secure_path, "r") as f:
-                                    data = json.load(f)
-
-                                if isinstance(data, list):
-                                    df = pd.json_normalize(data)
-                                    # Apply transformations if specified
-                                    if transform:
-                                        df = apply_transformations(df, transform)
-                                    # For large files, show preview
-                                    if len(df) > 1000:
-                                        preview_df = df.head(100)
-                                        result = preview_df.to_markdown(index=False)
-                                        result += (
-                                            f"\n\n*Note: Large JSON file detected. "
-                                            f"Showing first 100 records. "
-                                            f"Total records: {len(df)}*"
-                                        )
-                                    else:
-                                        result = df.to_markdown(index=False)
-                                elif isinstance(data, dict):
-                                    if flatten:
-                                        df = pd.json_normalize([data])
-                                        # Apply transformations if specified
-                                        if transform:
-                                            df = apply_transformations(df, transform)
-                                        result = df.to_markdown(index=False)
-                                    else:
-                                        result = (
-                                            "```json\n"
-                                            + json.dumps(data, indent=2)
-                                            + "\n```"
-                                        )
-                                else:
-                                    result = f"JSON content: {data}"
-                            else:
-                                # Normal processing
-                                with open(secure_path, "r") as f:
-                                    data = json.load(f)
-
-                                if isinstance(data, list):
-                                    df = pd.json_normalize(data)
-                                    # Apply transformations if specified
-                                    if transform:
-                                        df = apply_transformations(df, transform)
-                                    result = df.to_markdown(index=False)
-                                elif isinstance(data, dict):
-                                    if flatten:
-                                        df = pd.json_normalize([data])
-                                        # Apply transformations if specified
-                                        if transform:
-                                            df = apply_transformations(df, transform)
-                                        result = df.to_markdown(index=False)
-                                    else:
-                                        result = (
-                                            "```json\n"
-                                            + json.dumps(data, indent=2)
-                                            + "\n```"
-                                        )
-                                else:
-                                    result = f"JSON content: {data}"
-                            # Cache the result
-                            cache_manager.set(
-                                str(secure_path),
-                                result,
-                                flatten=flatten,
-                                transform=transform,
-                            )
-
-                        new_lines.append(result)
-
-                    elif cmd in ["xlsx", "xls", "xlsm", "ods"]:
-                        # Check if this format is enabled
-                        if not config.is_feature_enabled("excel_support"):
-                            raise ShortcodeError("Excel processing is disabled")
-
-                        sheet = sanitize_sheet_name(args[0] if args else 0)
-                        transform = sanitize_string_input(
-                            " ".join(args[1:]) if len(args) > 1 else "", max_length=1000
-                        )
-                        engine = "openpyxl"
-                        if cmd == "xls":
-                            engine = "xlrd"
-                        elif cmd == "ods":
-                            engine = "odf"
-
-                        # Check file size for large file handling
-                        file_size_mb = secure_path.stat().st_size / (1024 * 1024)
-                        max_file_size_mb = config.get_max_file_size_mb()
-                        streaming_threshold_mb = config.get_streaming_threshold_mb()
-
-                        # Try to get from cache first
-                        cache_key = f"excel:{secure_path}:{sheet}:{engine}:{transform}"
-                        df = cache_manager.get(
-                            str(secure_path),
-                            sheet=sheet,
-                            engine=engine,
-                            transform=transform,
-                        )
-
-                        if df is None:
-                            if file_size_mb > max_file_size_mb:
-                                # Use large file processing
-                                df = process_large_excel(
-                                    str(secure_path),
-                                    sheet_name=sheet,
-                                    transform=transform,
-                                    engine=engine,
-                                    max_memory_mb=max_file_size_mb,
-                                )
-                            elif file_size_mb > streaming_threshold_mb:
-                                # Use streaming processing for medium-sized files
-                                chunk_size = config.get_chunk_size()
-                                streaming_result = []
-                                for chunk_md in process_excel_streaming(
-                                    str(secure_path),
-                                    sheet_name=sheet,
-                                    transform=transform,
-                                    chunk_size=chunk_size,
-                                    engine=engine,
-                                ):
-                                    streaming_result.append(chunk_md)
-                                    streaming_result.append(
-                                        "\n---\n"
-                                    )  # Separator between chunks
-
-                                if streaming_result:
-                                    # Remove the last separator
-                                    streaming_result.pop()
-                                    df = "\n".join(streaming_result)
-                                else:
-                                    df = "Empty Excel file"
-                            else:
-                                # Normal processing for small files
-                                df = pd.read_excel(
-                                    secure_path, sheet_name=sheet, engine=engine
-                                )
-                                # Apply transformations if specified
-                                if transform:
-                                    df = apply_transformations(df, transform)
-                            # Cache the result
-                            cache_manager.set(
-                                str(secure_path),
-                                df,
-                                sheet=sheet,
-                                engine=engine,
-                                transform=transform,
-                            )
-
-                        # Handle string result from large file processing
-                        if isinstance(df, str):
-                            new_lines.append(df)
-                        else:
-                            new_lines.append(df.to_markdown(index=False))
-
-                    elif cmd == "pdf":
-                        # Check if PDF processing is enabled
-                        if not config.is_feature_enabled("pdf_processing"):
-                            raise ShortcodeError("PDF processing is disabled")
-
-                        pages = sanitize_string_input(
-                            args[0] if args else "all", max_length=20
-                        )
-
-                        # Try to get from cache first
-                        cache_key = f"pdf:{secure_path}:{pages}"
-                        text = cache_manager.get(str(secure_path), pages=pages)
-
-                        if text is None:
-                            with pdfplumber.open(secure_path) as pdf:
-                                if pages == "all":
-                                    text = "\n\n".join(
-                                        page.extract_text() or "" for page in pdf.pages
-                                    )
-                                else:
-                                    page_num = (
-                                        int(
-                                            sanitize_numeric_input(
-                                                pages, min_val=1, default=1
-                                            )
-                                        )
-                                        - 1
-                                    )
-                                    text = pdf.pages[page_num].extract_text() or ""
-                            # Cache the result
-                            cache_manager.set(str(secure_path), text, pages=pages)
-                        new_lines.append(text.strip())
-
-                    elif cmd == "pdf_table":
-                        # Check if PDF processing is enabled
-                        if not config.is_feature_enabled("pdf_processing"):
-                            new_lines.append("Error: PDF processing is disabled")
-                            continue
-
-                        # Parse arguments for pdf_table
-                        page = (
-                            int(sanitize_numeric_input(args[0], min_val=1, default=1))
-                            - 1
-                            if args and args[0]
-                            else 0
-                        )
-                        horizontal_strategy = sanitize_strategy(
-                            args[1]
-                            if len(args) > 1
-                            else config.get_default_pdf_strategy()
-                        )
-                        vertical_strategy = sanitize_strategy(
-                            args[2]
-                            if len(args) > 2
-                            else config.get_default_pdf_strategy()
-                        )
-
-                        # Parse threshold parameters (new feature)
-                        snap_tolerance = None
-                        edge_tolerance = None
-                        intersection_tolerance = None
-
-                        # Look for threshold parameters in the remaining arguments
-                        for i in range(3, len(args)):
-                            if args[i].startswith("snap=") and len(args[i]) > 5:
-                                try:
-                                    snap_tolerance = sanitize_numeric_input(
-                                        args[i][5:], min_val=0, max_val=100
-                                    )
-                                except (ValueError, TypeError):
-                                    pass
-                            elif args[i].startswith("edge=") and len(args[i]) > 5:
-                                try:
-                                    edge_tolerance = sanitize_numeric_input(
-                                        args[i][5:], min_val=0, max_val=100
-                                    )
-                                except (ValueError, TypeError):
-                                    pass
-                            elif args[i].startswith("intersect=") and len(args[i]) > 10:
-                                try:
-                                    intersection_tolerance = sanitize_numeric_input(
-                                        args[i][10:], min_val=0, max_val=100
-                                    )
-                                except (ValueError, TypeError):
-                                    pass
-
-                        # Prepare table settings with threshold parameters
-                        table_settings = {
-                            "horizontal_strategy": horizontal_strategy,
-                            "vertical_strategy": vertical_strategy,
-                        }
-
-                        # Add threshold parameters if provided
-                        if snap_tolerance is not None:
-                            table_settings["snap_tolerance"] = snap_tolerance
-                        if edge_tolerance is not None:
-                            table_settings["edge_tolerance"] = edge_tolerance
-                        if intersection_tolerance is not None:
-                            table_settings["intersection_tolerance"] = (
-                                intersection_tolerance
-                            )
-
-                        # Try to get from cache first
-                        cache_key = (
-                            f"pdf_table:{secure_path}:{page}:{horizontal_strategy}:"
-                            f"{vertical_strategy}"
-                        )
-                        if snap_tolerance is not None:
-                            cache_key += f":snap={snap_tolerance}"
-                        if edge_tolerance is not None:
-                            cache_key += f":edge={edge_tolerance}"
-                        if intersection_tolerance is not None:
-                            cache_key += f":intersect={intersection_tolerance}"
-
-                        tables_result = cache_manager.get(
-                            str(secure_path),
-                            page=page,
-                            horizontal_strategy=horizontal_strategy,
-                            vertical_strategy=vertical_strategy,
-                            snap_tolerance=snap_tolerance,
-                            edge_tolerance=edge_tolerance,
-                            intersection_tolerance=intersection_tolerance,
-                        )
-
-                        if tables_result is None:
-                            with pdfplumber.open(secure_path) as pdf:
-                                # Use strategy parameters and threshold parameters
-                                # for table extraction
-                                tables = pdf.pages[page].extract_tables(table_settings)
-                                if tables:
-                                    tables_result = []
-                                    for i, table in enumerate(tables):
-                                        if table and len(table) > 1:
-                                            df = pd.DataFrame(
-                                                table[1:], columns=table[0]
-                                            )
-                                            tables_result.append(f"### Table {i+1}")
-                                            tables_result.append(
-                                                df.to_markdown(index=False)
-                                            )
-                                            tables_result.append("")
-                                else:
-                                    tables_result = ["No tables found on this page."]
-                            # Cache the result
-                            cache_manager.set(
-                                str(secure_path),
-                                tables_result,
-                                page=page,
-                                horizontal_strategy=horizontal_strategy,
-                                vertical_strategy=vertical_strategy,
-                                snap_tolerance=snap_tolerance,
-                                edge_tolerance=edge_tolerance,
-                                intersection_tolerance=intersection_tolerance,
-                            )
-
-                        new_lines.extend(tables_result)
-
-                    elif cmd == "image_ocr":
-                        # Check if OCR is enabled
-                        if not config.is_feature_enabled("ocr_enabled"):
-                            raise ShortcodeError("OCR processing is disabled")
-
-                        lang = sanitize_language_code(
-                            args[0] if args else config.get_default_ocr_language()
-                        )
-
-                        # Try to get from cache first
-                        cache_key = f"ocr:{secure_path}:{lang}"
-                        text = cache_manager.get(str(secure_path), lang=lang)
-
-                        if text is None:
-                            image = Image.open(secure_path)
-                            text = pytesseract.image_to_string(image, lang=lang)
-                            # Cache the result
-                            cache_manager.set(str(secure_path), text, lang=lang)
-                        new_lines.append(text.strip())
-
-                    elif cmd == "video":
-                        # Check if video support is enabled
-                        if not config.is_feature_enabled("video_support"):
-                            raise ShortcodeError("Video processing is disabled")
-
-                        width = sanitize_numeric_input(
-                            args[0] if len(args) > 0 else "640",
-                            min_val=1,
-                            max_val=5000,
-                            default=640,
-                        )
-                        height = sanitize_numeric_input(
-                            args[1] if len(args) > 1 else "480",
-                            min_val=1,
-                            max_val=5000,
-                            default=480,
-                        )
-                        controls = sanitize_boolean_input(
-                            args[2] if len(args) > 2 else "true", default=True
-                        )
-                        autoplay = sanitize_boolean_input(
-                            args[3] if len(args) > 3 else "false", default=False
-                        )
-
-                        controls_attr = " controls" if controls else ""
-                        autoplay_attr = " autoplay" if autoplay else ""
-
-                        video_html = (
-                            f'<video width="{width}" height="{height}"'
-                            f"{controls_attr}{autoplay_attr}>\n"
-                            f'  <source src="{secure_path}" type="video/mp4">\n'
-                            "  Your browser does not support the video tag.\n"
-                            "</video>"
-                        )
-                        new_lines.append(video_html)
-
-                    elif cmd == "video_thumb":
-                        # Check if video support is enabled
-                        if not config.is_feature_enabled("video_support"):
-                            raise ShortcodeError("Video processing is disabled")
-
-                        # Check if moviepy is available
-                        if not MOVIEPY_AVAILABLE:
-                            raise ShortcodeError(
-                                "moviepy not available for video thumbnail generation"
-                            )
-
-                        # Extract time parameter (required)
-                        if not args:
-                            raise ShortcodeError("video_thumb requires time parameter")
-
-                        try:
-                            time = sanitize_numeric_input(args[0], min_val=0, default=0)
-                            width = sanitize_numeric_input(
-                                args[1] if len(args) > 1 else None,
-                                min_val=1,
-                                max_val=5000,
-                            )
-                            height = sanitize_numeric_input(
-                                args[2] if len(args) > 2 else None,
-                                min_val=1,
-                                max_val=5000,
-                            )
-
-                            # Generate thumbnail using moviepy
-                            clip = VideoFileClip(str(secure_path))
-
-                            # Extract frame at specified time
-                            frame = clip.get_frame(t=time)
-
-                            # Convert to PIL Image
-                            image = Image.fromarray(frame)
-
-                            # Resize if dimensions provided
-                            if width or height:
-                                if not width:
-                                    # Calculate width to maintain aspect ratio
-                                    aspect_ratio = image.width / image.height
-                                    width = int(height * aspect_ratio)
-                                elif not height:
-                                    # Calculate height to maintain aspect ratio
-                                    aspect_ratio = image.height / image.width
-                                    height = int(width * aspect_ratio)
-                                image = image.resize((width, height))
-
-                            # Generate thumbnail filename
-                            file_path_obj = Path(secure_path)
-                            thumb_filename = f"{file_path_obj.stem}_thumb_{time}s.png"
-                            thumb_path = file_path_obj.parent / thumb_filename
-
-                            # Save thumbnail
-                            image.save(thumb_path, "PNG")
-
-                            # Generate markdown image tag
-                            new_lines.append(
-                                f"![Video Thumbnail at {time}s]({thumb_path})"
-                            )
-
-                            # Clean up
-                            clip.close()
-
-                        except Exception as e:
-                            new_lines.append(f"Error generating thumbnail: {str(e)}")
-
-                    elif cmd == "chart":
-                        # Check if matplotlib is available
-                        if not MATPLOTLIB_AVAILABLE:
-                            error_msg = "Error: Chart generation requires matplotlib"
-                            new_lines.append(error_msg)
-                            continue
-
-                        # Parse chart arguments
-                        chart_type = sanitize_chart_type(args[0] if args else "bar")
-                        x_column = sanitize_string_input(
-                            args[1] if len(args) > 1 else "", max_length=100
-                        )
-                        y_column = sanitize_string_input(
-                            args[2] if len(args) > 2 else "", max_length=100
-                        )
-                        options_str = " ".join(args[3:]) if len(args) > 3 else ""
-                        options = sanitize_chart_options(options_str)
-
-                        # Generate chart filename
-                        file_path_obj = Path(secure_path)
-                        chart_filename = f"{file_path_obj.stem}_chart_{chart_type}.png"
-                        chart_path = file_path_obj.parent / chart_filename
-
-                        # Try to get from cache first
-                        cache_key = (
-                            f"chart:{secure_path}:{chart_type}:{x_column}:"
-                            f"{y_column}:{options_str}"
-                        )
-                        cached_chart_path = cache_manager.get(
-                            str(secure_path),
-                            chart_type=chart_type,
-                            x_column=x_column,
-                            y_column=y_column,
-                            options=options_str,
-                        )
-
-                        if cached_chart_path is None or not os.path.exists(
-                            cached_chart_path
-                        ):
-                            try:
-                                # Read data
-                                file_ext = secure_path.suffix.lower()
-                                if file_ext == ".csv":
-                                    df = pd.read_csv(secure_path)
-                                elif file_ext in [".xlsx", ".xls", ".xlsm"]:
-                                    engine = (
-                                        "openpyxl" if file_ext != ".xls" else "xlrd"
-                                    )
-                                    df = pd.read_excel(secure_path, engine=engine)
-                                elif file_ext == ".json":
-                                    with open(secure_path, "r") as f:
-                                        data = json.load(f)
-                                    df = (
-                                        pd.json_normalize(data)
-                                        if isinstance(data, list)
-                                        else pd.DataFrame([data])
-                                    )
-                                else:
-                                    error_msg = (
-                                        "Unsupported file format for chart generation"
-                                    )
-                                    raise ShortcodeError(error_msg)
-
-                                # Apply transformations if specified in options
-                                if "transform" in options:
-                                    df = apply_transformations(df, options["transform"])
-
-                                # Validate columns
-                                if x_column and x_column not in df.columns:
-                                    error_msg = (
-                                        f"X column '{x_column}' not found in data"
-                                    )
-                                    raise ShortcodeError(error_msg)
-                                if y_column and y_column not in df.columns:
-                                    error_msg = (
-                                        f"Y column '{y_column}' not found in data"
-                                    )
-                                    raise ShortcodeError(error_msg)
-
-                                # Generate chart
-                                plt.figure(figsize=(10, 6))
-
-                                if chart_type == "bar":
-                                    if x_column and y_column:
-                                        df.plot(
-                                            x=x_column,
-                                            y=y_column,
-                                            kind="bar",
-                                            ax=plt.gca(),
-                                        )
-                                    elif y_column:
-                                        df[y_column].plot(kind="bar", ax=plt.gca())
-                                    else:
-                                        df.plot(kind="bar", ax=plt.gca())
-                                elif chart_type == "line":
-                                    if x_column and y_column:
-                                        df.plot(
-                                            x=x_column,
-                                            y=y_column,
-                                            kind="line",
-                                            ax=plt.gca(),
-                                        )
-                                    elif y_column:
-                                        df[y_column].plot(kind="line", ax=plt.gca())
-                                    else:
-                                        df.plot(kind="line", ax=plt.gca())
-                                elif chart_type == "pie":
-                                    if y_column:
-                                        if x_column:
-                                            df.plot(
-                                                x=x_column,
-                                                y=y_column,
-                                                kind="pie",
-                                                ax=plt.gca(),
-                                                ylabel="",
-                                            )
-                                        else:
-                                            df[y_column].plot(
-                                                kind="pie", ax=plt.gca(), ylabel=""
-                                            )
-                                    else:
-                                        error_msg = "Pie charts require a Y column"
-                                        plt.close()
-                                        raise ShortcodeError(error_msg)
-                                elif chart_type == "scatter":
-                                    if x_column and y_column:
-                                        df.plot(
-                                            x=x_column,
-                                            y=y_column,
-                                            kind="scatter",
-                                            ax=plt.gca(),
-                                        )
-                                    else:
-                                        error_msg = (
-                                            "Scatter plots require both X and Y columns"
-                                        )
-                                        plt.close()
-                                        raise ShortcodeError(error_msg)
-                                elif chart_type == "histogram":
-                                    if y_column:
-                                        df[y_column].plot(kind="hist", ax=plt.gca())
-                                    else:
-                                        # Use first numeric column
-                                        numeric_cols = df.select_dtypes(
-                                            include=["number"]
-                                        ).columns
-                                        if len(numeric_cols) > 0:
-                                            df[numeric_cols[0]].plot(
-                                                kind="hist", ax=plt.gca()
-                                            )
-                                        else:
-                                            error_msg = (
-                                                "Error: No numeric columns found "
-                                                "for histogram"
-                                            )
-                                            new_lines.append(error_msg)
-                                            plt.close()
-                                            continue
-
-                                # Apply customizations from options
-                                if "title" in options:
-                                    plt.title(options["title"])
-                                if "xlabel" in options:
-                                    plt.xlabel(options["xlabel"])
-                                if "ylabel" in options:
-                                    plt.ylabel(options["ylabel"])
-
-                                # Generate chart with enhanced customization
-                                figsize = (10, 6)
-                                if "width" in options and "height" in options:
-                                    figsize = (options["width"], options["height"])
-                                elif "width" in options:
-                                    figsize = (options["width"], figsize[1])
-                                elif "height" in options:
-                                    figsize = (figsize[0], options["height"])
-
-                                plt.figure(figsize=figsize)
-
-                                # Handle color parameter
-                                color = options.get("color", None)
-
-                                # Handle other styling options
-                                alpha = options.get("alpha", 1.0)  # Transparency
-                                linestyle = options.get(
-                                    "linestyle", "-"
-                                )  # Line style for line charts
-                                marker = options.get(
-                                    "marker", None
-                                )  # Marker for line charts
-
-                                if chart_type == "bar":
-                                    if x_column and y_column:
-                                        df.plot(
-                                            x=x_column,
-                                            y=y_column,
-                                            kind="bar",
-                                            ax=plt.gca(),
-                                            color=color,
-                                            alpha=alpha,
-                                        )
-                                    elif y_column:
-                                        df[y_column].plot(
-                                            kind="bar",
-                                            ax=plt.gca(),
-                                            color=color,
-                                            alpha=alpha,
-                                        )
-                                    else:
-                                        df.plot(
-                                            kind="bar",
-                                            ax=plt.gca(),
-                                            color=color,
-                                            alpha=alpha,
-                                        )
-                                elif chart_type == "line":
-                                    if x_column and y_column:
-                                        df.plot(
-                                            x=x_column,
-                                            y=y_column,
-                                            kind="line",
-                                            ax=plt.gca(),
-                                            color=color,
-                                            alpha=alpha,
-                                            linestyle=linestyle,
-                                            marker=marker,
-                                        )
-                                    elif y_column:
-                                        df[y_column].plot(
-                                            kind="line",
-                                            ax=plt.gca(),
-                                            color=color,
-                                            alpha=alpha,
-                                            linestyle=linestyle,
-                                            marker=marker,
-                                        )
-                                    else:
-                                        df.plot(
-                                            kind="line",
-                                            ax=plt.gca(),
-                                            color=color,
-                                            alpha=alpha,
-                                            linestyle=linestyle,
-                                            marker=marker,
-                                        )
-                                elif chart_type == "pie":
-                                    if y_column:
-                                        if x_column:
-                                            df.plot(
-                                                x=x_column,
-                                                y=y_column,
-                                                kind="pie",
-                                                ax=plt.gca(),
-                                                ylabel="",
-                                                color=color,
-                                            )
-                                        else:
-                                            df[y_column].plot(
-                                                kind="pie",
-                                                ax=plt.gca(),
-                                                ylabel="",
-                                                color=color,
-                                            )
-                                    else:
-                                        error_msg = (
-                                            "Error: Pie charts require a Y column"
-                                        )
-                                        new_lines.append(error_msg)
-                                        plt.close()
-                                        continue
-                                elif chart_type == "scatter":
-                                    if x_column and y_column:
-                                        # Handle scatter plot specific options
-                                        s = options.get("size", 20)  # Marker size
-                                        df.plot(
-                                            x=x_column,
-                                            y=y_column,
-                                            kind="scatter",
-                                            ax=plt.gca(),
-                                            color=color,
-                                            alpha=alpha,
-                                            s=s,
-                                        )
-                                    else:
-                                        error_msg = (
-                                            "Error: Scatter plots require both X "
-                                            "and Y columns"
-                                        )
-                                        new_lines.append(error_msg)
-                                        plt.close()
-                                        continue
-                                elif chart_type == "histogram":
-                                    # Handle histogram specific options
-                                    bins = options.get("bins", 10)  # Number of bins
-                                    if y_column:
-                                        df[y_column].plot(
-                                            kind="hist",
-                                            ax=plt.gca(),
-                                            color=color,
-                                            alpha=alpha,
-                                            bins=bins,
-                                        )
-                                    else:
-                                        # Use first numeric column
-                                        numeric_cols = df.select_dtypes(
-                                            include=["number"]
-                                        ).columns
-                                        if len(numeric_cols) > 0:
-                                            df[numeric_cols[0]].plot(
-                                                kind="hist",
-                                                ax=plt.gca(),
-                                                color=color,
-                                                alpha=alpha,
-                                                bins=bins,
-                                            )
-                                        else:
-                                            error_msg = (
-                                                "No numeric columns found for histogram"
-                                            )
-                                            plt.close()
-                                            raise ShortcodeError(error_msg)
-
-                                # Apply grid if requested
-                                if options.get("grid", False):
-                                    plt.grid(True)
-
-                                # Save chart
-                                plt.tight_layout()
-                                plt.savefig(chart_path)
-                                plt.close()
-
-                                # Cache the chart path
-                                cache_manager.set(
-                                    str(secure_path),
-                                    str(chart_path),
-                                    chart_type=chart_type,
-                                    x_column=x_column,
-                                    y_column=y_column,
-                                    options=options_str,
-                                )
-
-                                cached_chart_path = str(chart_path)
-                            except ShortcodeError:
-                                if plt:
-                                    plt.close()
-                                raise
-                            except Exception as e:
-                                if plt:
-                                    plt.close()
-                                error_msg = f"Error generating chart: {str(e)}"
-                                raise ShortcodeError(error_msg) from e
-
-                        # Generate markdown image tag
-                        alt_text = f"{chart_type.capitalize()} chart"
-                        if "title" in options:
-                            alt_text = options["title"]
-                        new_lines.append(f"![{alt_text}]({cached_chart_path})")
+                        resolved_paths[file_path] = resolve_secure_path(file_path)
+                    except FileResolutionError:
+                        pass
+            # Readers spend most of their time in native code or waiting on
+            # disk, so independent shortcodes overlap well on threads
+            executor = ThreadPoolExecutor(max_workers=workers)
+            futures = {
+                idx: executor.submit(
+                    self._expand, idx, lines[idx - 1], shortcodes[idx], resolved_paths
+                )
+                for idx in pooled
+            }
 
-                    else:
-                        raise ShortcodeError(
-                            f"Unknown Data Markdown (DataMD) command: {cmd}"
-                        )
-
-                except ShortcodeError as e:
-                    shortcode_text = line.strip()
-                    context = f"Error in shortcode at {self.source_path}:{idx}: {shortcode_text}"
-                    raise ShortcodeError(f"{context}: {e}") from e
-                except Exception as e:
-                    shortcode_text = line.strip()
-                    context = f"Error in shortcode at {self.source_path}:{idx}: {shortcode_text}"
-                    raise ShortcodeError(
-                        f"{context}: {cmd} file {file_path}: {str(e)}"
-                    ) from e
-
-                continue
-
-            new_lines.append(line)
-
-        return new_lines
+        try:
+            for idx, line in enumerate(lines, start=1):
+                match = shortcodes.get(idx)
+                if match is None:
+                    yield line
+                elif idx in futures:
+                    yield from futures[idx].result()
+                else:
+                    # Everything else runs here, in document order
+                    yield from self._expand(idx, line, match, resolved_paths)
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+
+    def _expand(self, idx, line, match, resolved_paths):
+        """
+        Expand one shortcode.
+
+        Args:
+            idx (int): Line number of the shortcode
+            line (str): The shortcode line
+            match (re.Match): Shortcode pattern match on the line
+            resolved_paths (dict): Paths resolved so far in this render
+
+        Returns:
+            list or tuple: Lines to put in place of the shortcode
+
+        Raises:
+            ShortcodeError: With the shortcode's location, if expanding fails
+        """
+        cmd = match.group(1)
+        file_path = match.group(2)
+        # A tuple serves both as the handler arguments and as part of the
+        # render cache key
+        args = tuple(match.group(3).split()) if match.group(3) else ()
+
+        try:
+            # Resolve the file path securely
+            secure_path = resolved_paths.get(file_path)
+            if secure_path is None:
+                try:
+                    secure_path = resolve_secure_path(file_path)
+                except FileResolutionError as e:
+                    raise ShortcodeError(str(e)) from e
+                resolved_paths[file_path] = secure_path
+
+            handler = _HANDLERS.get(cmd)
+            if handler is None:
+                raise ShortcodeError(f"Unknown Data Markdown (DataMD) command: {cmd}")
+            if cmd in _MEMOIZED_COMMANDS:
+                stat = secure_path.stat()
+                return _render_cached(
+                    cmd,
+                    str(secure_path),
+                    stat.st_mtime_ns,
+                    stat.st_size,
+                    args,
+                    config.revision,
+                )
+            return handler(secure_path, args)
+
+        except ShortcodeError as e:
+            shortcode_text = line.strip()
+            context = (
+                f"Error in shortcode at {self.source_path}:{idx}: {shortcode_text}"
+            )
+            raise ShortcodeError(f"{context}: {e}") from e
+        except Exception as e:
+            shortcode_text = line.strip()
+            context = (
+                f"Error in shortcode at {self.source_path}:{idx}: {shortcode_text}"
+            )
+            raise ShortcodeError(f"{context}: {cmd} file {file_path}: {str(e)}") from e
 
 
 class DataMDExtension(Extension):
@@ -8,7 +8,12 @@ import argparse
 import logging
 import os
 import sys
+import threading
 import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import islice
 from pathlib import Path
 
 # Add the python_implementation directory to the path for direct execution
@@ -32,6 +37,30 @@ except (ImportError, ValueError):  # pragma: no cover
     from config import get_config
 
 
+# One Markdown instance per thread; building one registers every processor
+# and compiles their patterns, which costs as much as converting a small file
+_markdown = threading.local()
+
+
+def _get_markdown(source_path):
+    """
+    Get this thread's Markdown instance, reset for a new document.
+
+    Args:
+        source_path (str): Document path, used in shortcode error messages
+
+    Returns:
+        markdown.Markdown: Converter with the DataMD extension
+    """
+    md = getattr(_markdown, "instance", None)
+    if md is None:
+        md = markdown.Markdown(extensions=[DataMDExtension()])
+        _markdown.instance = md
+    md.reset()
+    md.preprocessors["datamd"].source_path = source_path
+    return md
+
+
 def process_dmd_file(
     input_file,
     output_file=None,
@@ -57,7 +86,7 @@ def process_dmd_file(
 
     try:
         # Process with DataMD extension, include source path for contextual errors
-        md = markdown.Markdown(extensions=[DataMDExtension(source_path=input_file)])
+        md = _get_markdown(input_file)
         html_content = md.convert(content)
     except Exception as exc:
         logger.error(
@@ -183,29 +212,68 @@ def process_directory(
         extra={"count": len(dmd_files), "directory": str(directory)},
     )
 
-    success = True
-    for dmd_file in dmd_files:
-        if verbose:
-            logger.info(
-                "Processing file in directory",
-                extra={"file": dmd_file.name, "directory": str(directory)},
-            )
-        ok = process_dmd_file(
-            str(dmd_file),
-            output_format=output_format,
-            style_options=style_options,
-            verbose=verbose,
-            chunk_size=chunk_size,
-            max_memory_mb=max_memory_mb,
-            strict=strict,
+    render = partial(
+        process_dmd_file,
+        output_format=output_format,
+        style_options=style_options,
+        verbose=verbose,
+        chunk_size=chunk_size,
+        max_memory_mb=max_memory_mb,
+        strict=strict,
+    )
+    executor = None
+    # Each file already renders its shortcodes on a thread pool, so files
+    # only get processes of their own when performance.max_workers asks
+    workers = min(get_config().get_max_workers() or 1, len(dmd_files))
+    if workers > 1:
+        # Workers get this process' configuration, which may hold
+        # command-line overrides
+        executor = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_directory_worker,
+            initargs=(get_config().to_dict(),),
         )
-        if not ok:
-            success = False
-            if strict:
-                break
+
+    success = True
+    pending = deque()
+    unsubmitted = iter(dmd_files)
+    try:
+        for dmd_file in dmd_files:
+            if verbose:
+                logger.info(
+                    "Processing file in directory",
+                    extra={"file": dmd_file.name, "directory": str(directory)},
+                )
+            if executor is not None:
+                # At most one file per worker is in flight, so a strict run
+                # stops writing output shortly after a failure
+                for queued in islice(unsubmitted, workers - len(pending)):
+                    pending.append(executor.submit(render, str(queued)))
+                ok = pending.popleft().result()
+            else:
+                ok = render(str(dmd_file))
+            if not ok:
+                success = False
+                if strict:
+                    break
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
     return success
 
 
+def _init_directory_worker(settings):
+    """Apply the parent's configuration in a :func:`process_directory` worker."""
+    config = get_config()
+    for section, values in settings.items():
+        if isinstance(values, dict):
+            for key, value in values.items():
+                config.set(f"{section}.{key}", value)
+    # The directory pool already fills the machine; pools nested inside a
+    # worker (shortcode threads, PDF pages) would only oversubscribe it
+    config.set("performance.max_workers", 1)
+
+
 def watch_path(
     target_path,
     output_format="html",
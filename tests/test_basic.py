@@ -27,3 +27,508 @@ def test_process_simple_example(tmp_path: Path):
     html = out_file.read_text(encoding="utf-8")
     assert "Sales Data" in html
     assert "App Configuration" in html
+
+
+def test_unknown_command_raises(monkeypatch):
+    import markdown
+    import pytest
+
+    from python_implementation.datamd_ext import DataMDPreprocessor
+    from python_implementation.exceptions import ShortcodeError
+
+    monkeypatch.chdir(Path(__file__).resolve().parents[1])
+    pre = DataMDPreprocessor(markdown.Markdown(), source_path="doc.dmd")
+
+    # Lines that are not shortcodes pass through untouched
+    assert pre.run(["text {{ csv }}", "plain"]) == ["text {{ csv }}", "plain"]
+
+    with pytest.raises(ShortcodeError, match="Unknown Data Markdown"):
+        pre.run(['{{ nope "data/sales.csv" }}'])
+
+
+def test_rendered_output_follows_file_changes(tmp_path: Path, monkeypatch):
+    import markdown
+
+    from python_implementation.datamd_ext import DataMDPreprocessor, cache_manager
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(cache_manager, "cache_dir", tmp_path / "cache")
+    (tmp_path / "cache").mkdir()
+    csv_file = tmp_path / "data.csv"
+    csv_file.write_text("a,b\n1,2\n", encoding="utf-8")
+    pre = DataMDPreprocessor(markdown.Markdown(), source_path="doc.dmd")
+
+    first = pre.run(['{{ csv "data.csv" }}'])
+    assert pre.run(['{{ csv "data.csv" }}']) == first
+
+    csv_file.write_text("a,b\n1,2\n3,4\n", encoding="utf-8")
+    assert "3" in pre.run(['{{ csv "data.csv" }}'])[0]
+
+
+def test_pdf_text_engines_agree(tmp_path: Path, monkeypatch):
+    import pytest
+
+    pytest.importorskip("pymupdf")
+    from matplotlib.backends.backend_pdf import PdfPages
+    from matplotlib.figure import Figure
+
+    from python_implementation import datamd_ext
+
+    pdf_file = tmp_path / "doc.pdf"
+    with PdfPages(pdf_file) as pdf:
+        for number in range(1, 6):
+            fig = Figure()
+            fig.text(0.1, 0.5, f"Page {number} text")
+            pdf.savefig(fig)
+
+    expected = [f"Page {number} text" for number in range(1, 6)]
+    fast = [text.strip() for text in datamd_ext._iter_pdf_text(pdf_file)]
+    monkeypatch.setattr(datamd_ext, "PYMUPDF_AVAILABLE", False)
+    # Five pages are spread over worker processes
+    monkeypatch.setattr(datamd_ext.os, "cpu_count", lambda: 2)
+    slow = [text.strip() for text in datamd_ext._iter_pdf_text(pdf_file)]
+    assert slow == fast == expected
+    assert list(datamd_ext._iter_pdf_text(pdf_file, 1)) == ["Page 2 text"]
+
+
+def test_ocr_reuses_tesseract_api(monkeypatch):
+    from types import SimpleNamespace
+
+    from PIL import Image
+
+    from python_implementation import datamd_ext
+
+    created = []
+    paths = []
+
+    class FakeAPI:
+        def __init__(self, lang, path=None):
+            created.append(lang)
+            paths.append(path)
+
+        def SetImage(self, image):
+            self.size = image.size
+
+        def GetUTF8Text(self):
+            return f"{self.size[0]}x{self.size[1]}"
+
+    monkeypatch.setattr(datamd_ext, "TESSEROCR_AVAILABLE", True)
+    monkeypatch.setattr(datamd_ext, "tesserocr", SimpleNamespace(PyTessBaseAPI=FakeAPI))
+    monkeypatch.setattr(datamd_ext, "_TESS_APIS", {})
+
+    image = Image.new("L", (4, 3))
+    assert datamd_ext._ocr_image(image, "eng") == "4x3"
+    assert datamd_ext._ocr_image(image, "eng") == "4x3"
+    datamd_ext._ocr_image(image, "deu")
+    assert created == ["eng", "deu"]
+
+    # A configured language data directory gets its own API
+    datamd_ext._ocr_image(image, "eng", "/opt/tessdata_fast")
+    datamd_ext._ocr_image(image, "eng", "/opt/tessdata_fast")
+    assert created == ["eng", "deu", "eng"]
+    assert paths == [None, None, "/opt/tessdata_fast"]
+
+    # A language tesserocr can't load is tried once, then left to pytesseract
+    def missing_language(lang, path=None):
+        created.append(lang)
+        raise RuntimeError("Failed to init API")
+
+    fallback = []
+    monkeypatch.setattr(datamd_ext.tesserocr, "PyTessBaseAPI", missing_language)
+    monkeypatch.setattr(
+        datamd_ext,
+        "pytesseract",
+        SimpleNamespace(image_to_string=lambda image, lang: fallback.append(lang)),
+    )
+    datamd_ext._ocr_image(image, "fra")
+    datamd_ext._ocr_image(image, "fra")
+    assert created == ["eng", "deu", "eng", "fra"]
+    assert fallback == ["fra", "fra"]
+
+
+def test_concurrent_ocr_uses_separate_apis(monkeypatch):
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+    from types import SimpleNamespace
+
+    from PIL import Image
+
+    from python_implementation import datamd_ext
+
+    created = []
+    # Both calls must be recognizing at once to get past the barrier
+    barrier = threading.Barrier(2, timeout=5)
+
+    class FakeAPI:
+        def __init__(self, lang, path=None):
+            created.append(self)
+
+        def SetImage(self, image):
+            pass
+
+        def GetUTF8Text(self):
+            barrier.wait()
+            return "text"
+
+    monkeypatch.setattr(datamd_ext, "TESSEROCR_AVAILABLE", True)
+    monkeypatch.setattr(datamd_ext, "tesserocr", SimpleNamespace(PyTessBaseAPI=FakeAPI))
+    monkeypatch.setattr(datamd_ext, "_TESS_APIS", {})
+
+    image = Image.new("L", (4, 3))
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        texts = list(executor.map(datamd_ext._ocr_image, [image] * 2, ["eng"] * 2))
+    assert texts == ["text", "text"]
+    assert len(created) == 2
+    # Both APIs went back to the idle pool for later images
+    assert set(datamd_ext._TESS_APIS[("", "eng")]) == set(created)
+
+
+def test_ocr_image_is_binarized(tmp_path: Path, monkeypatch):
+    import pytest
+    from PIL import Image
+
+    from python_implementation import datamd_ext
+
+    if not datamd_ext.CV2_AVAILABLE:
+        pytest.skip("OpenCV not installed")
+
+    src = tmp_path / "scan.png"
+    image = Image.new("RGB", (8, 4), (200, 190, 180))
+    image.paste((20, 30, 40), (0, 0, 4, 4))
+    image.save(src)
+
+    loaded = datamd_ext._load_ocr_image(src)
+    assert loaded.mode == "L"
+    assert loaded.size == (8, 4)
+    assert set(loaded.getdata()) == {0, 255}
+
+    # Large images are scaled to fit, keeping their aspect ratio
+    assert datamd_ext._load_ocr_image(src, max_dimension=4).size == (4, 2)
+    monkeypatch.setattr(datamd_ext, "CV2_AVAILABLE", False)
+    assert datamd_ext._load_ocr_image(src, max_dimension=4).size == (4, 2)
+    assert datamd_ext._load_ocr_image(src, max_dimension=8).size == (8, 4)
+
+
+def test_video_tag_escapes_source(tmp_path: Path):
+    from python_implementation import datamd_ext
+
+    video = tmp_path / 'a&"b.mp4'
+    video.write_bytes(b"")
+
+    (html,) = datamd_ext._handle_video(video, ["320", "240", "false", "true"])
+    assert html.startswith('<video width="320" height="240" autoplay>\n')
+    assert "a&amp;&quot;b.mp4" in html
+    assert html.endswith("  Your browser does not support the video tag.\n</video>")
+
+
+def test_long_tables_are_truncated(tmp_path: Path, monkeypatch):
+    from python_implementation import datamd_ext
+
+    monkeypatch.setattr(datamd_ext.cache_manager, "cache_dir", tmp_path / "cache")
+    (tmp_path / "cache").mkdir()
+    csv_file = tmp_path / "rows.csv"
+    csv_file.write_text("n\n" + "".join(f"{i}\n" for i in range(5)))
+
+    monkeypatch.setattr(datamd_ext.config, "get_max_table_rows", lambda: 3)
+    (table,) = datamd_ext._handle_csv(csv_file, ())
+    assert table.splitlines()[2:5] == ["|   0 |", "|   1 |", "|   2 |"]
+    assert table.endswith("*Note: Showing first 3 rows. Total rows: 5*")
+
+    monkeypatch.setattr(datamd_ext.config, "get_max_table_rows", lambda: 0)
+    (table,) = datamd_ext._handle_csv(csv_file, ())
+    assert table.splitlines()[-1] == "|   4 |"
+
+
+def test_streamed_tables_are_truncated(tmp_path: Path, monkeypatch):
+    from python_implementation import datamd_ext
+
+    monkeypatch.setattr(datamd_ext.cache_manager, "cache_dir", tmp_path / "cache")
+    (tmp_path / "cache").mkdir()
+    csv_file = tmp_path / "rows.csv"
+    csv_file.write_text("n\n" + "".join(f"{i}\n" for i in range(5)))
+
+    # Any non-empty file is above a zero streaming threshold
+    monkeypatch.setattr(datamd_ext.config, "get_streaming_threshold_mb", lambda: 0)
+    monkeypatch.setattr(datamd_ext.config, "get_chunk_size", lambda: 2)
+    monkeypatch.setattr(datamd_ext.config, "get_max_table_rows", lambda: 3)
+    (table,) = datamd_ext._handle_csv(csv_file, ())
+    rows = [line for line in table.splitlines() if line.strip("| ").isdigit()]
+    assert rows == ["|   0 |", "|   1 |", "|   2 |"]
+    assert table.endswith("*Note: Showing first 3 rows. Total rows: 5*")
+
+    # A limit on a chunk boundary leaves only the note after the last table
+    monkeypatch.setattr(datamd_ext.config, "get_max_table_rows", lambda: 2)
+    (table,) = datamd_ext._handle_csv(csv_file, ())
+    assert table.endswith(
+        "|   1 |\n\n---\n\n*Note: Showing first 2 rows. Total rows: 5*"
+    )
+
+    monkeypatch.setattr(datamd_ext.config, "get_max_table_rows", lambda: 0)
+    (table,) = datamd_ext._handle_csv(csv_file, ())
+    assert table.count("---\n") == 2
+    assert table.splitlines()[-1] == "|   4 |"
+
+
+def test_pdf_handles_are_reused_until_the_file_changes(tmp_path: Path, monkeypatch):
+    import os
+
+    from matplotlib.backends.backend_pdf import PdfPages
+    from matplotlib.figure import Figure
+
+    from python_implementation import datamd_ext
+
+    monkeypatch.setattr(datamd_ext, "_PDF_HANDLES", datamd_ext.OrderedDict())
+    pdf_file = tmp_path / "doc.pdf"
+    with PdfPages(pdf_file) as pdf:
+        pdf.savefig(Figure())
+
+    with datamd_ext._open_pdf(pdf_file) as first:
+        pass
+    with datamd_ext._open_pdf(pdf_file) as again:
+        assert again is first
+        # The handle is the caller's until it is returned
+        with datamd_ext._open_pdf(pdf_file) as other:
+            assert other is not first
+    # One idle handle per file is kept; the surplus one is closed
+    assert list(datamd_ext._PDF_HANDLES.values()) == [other]
+    assert first.stream.closed and not other.stream.closed
+
+    stat = pdf_file.stat()
+    os.utime(pdf_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    with datamd_ext._open_pdf(pdf_file) as second:
+        assert second is not other
+    assert list(datamd_ext._PDF_HANDLES.values()) == [second]
+
+    if datamd_ext.PYMUPDF_AVAILABLE:
+        # Each library keeps its own handle for the same file version
+        with datamd_ext._open_pdf(pdf_file, datamd_ext.pymupdf.open) as doc:
+            pass
+        with datamd_ext._open_pdf(pdf_file, datamd_ext.pymupdf.open) as again:
+            assert again is doc
+        with datamd_ext._open_pdf(pdf_file) as again:
+            assert again is second
+        assert len(datamd_ext._PDF_HANDLES) == 2
+    datamd_ext._close_pdf_handles()
+
+
+def test_pdf_handles_in_use_survive_eviction(tmp_path: Path, monkeypatch):
+    import threading
+
+    from matplotlib.backends.backend_pdf import PdfPages
+    from matplotlib.figure import Figure
+
+    from python_implementation import datamd_ext
+
+    monkeypatch.setattr(datamd_ext, "_PDF_HANDLES", datamd_ext.OrderedDict())
+    # Every returned handle evicts the other file's
+    monkeypatch.setattr(datamd_ext, "_PDF_HANDLES_MAX", 1)
+    monkeypatch.setattr(datamd_ext.os, "cpu_count", lambda: 1)
+    files = []
+    for name in ("one", "two"):
+        pdf_file = tmp_path / f"{name}.pdf"
+        with PdfPages(pdf_file) as pdf:
+            for number in range(1, 4):
+                fig = Figure()
+                fig.text(0.1, 0.5, f"{name} page {number}")
+                pdf.savefig(fig)
+        files.append(pdf_file)
+
+    def render(pdf_file):
+        try:
+            for _ in range(20):
+                texts = [t.strip() for t in datamd_ext._iter_pdf_text(pdf_file)]
+                assert texts == [f"{pdf_file.stem} page {n}" for n in range(1, 4)]
+                (text,) = datamd_ext._iter_pdf_text(pdf_file, 1)
+                assert text.strip() == f"{pdf_file.stem} page 2"
+            results[pdf_file.stem] = texts
+        except Exception as exc:  # pragma: no cover - reported below
+            errors.append(exc)
+
+    # Without PyMuPDF, both threads go through pdfplumber's page cache
+    for pymupdf_available in {datamd_ext.PYMUPDF_AVAILABLE, False}:
+        monkeypatch.setattr(datamd_ext, "PYMUPDF_AVAILABLE", pymupdf_available)
+        results = {}
+        errors = []
+        # Hold a handle while the two files are rendered from two threads
+        with datamd_ext._open_pdf(files[0]) as held:
+            threads = [threading.Thread(target=render, args=(f,)) for f in files]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            assert held.pages[0].extract_text() == "one page 1"
+        assert errors == []
+        assert sorted(results) == ["one", "two"]
+    datamd_ext._close_pdf_handles()
+
+
+def test_paths_resolved_once_per_render(tmp_path: Path, monkeypatch):
+    import markdown
+
+    from python_implementation import datamd_ext
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(datamd_ext.cache_manager, "cache_dir", tmp_path / "cache")
+    (tmp_path / "cache").mkdir()
+    (tmp_path / "data.csv").write_text("a,b\n1,2\n", encoding="utf-8")
+
+    calls = []
+    resolve = datamd_ext.resolve_secure_path
+
+    def counting_resolve(file_path):
+        calls.append(file_path)
+        return resolve(file_path)
+
+    monkeypatch.setattr(datamd_ext, "resolve_secure_path", counting_resolve)
+    pre = datamd_ext.DataMDPreprocessor(markdown.Markdown())
+    lines = ['{{ csv "data.csv" }}', "", '{{ csv "data.csv" ; }}']
+    assert len(pre.run(lines)) == 3
+    assert calls == ["data.csv"]
+
+
+def test_json_code_block_matches_json_dumps():
+    import json
+    import math
+
+    from python_implementation import datamd_ext
+
+    samples = [
+        {"a": [1, 2, {"b": None, "c": []}], "e": {}, "f": 'x"\\\n\t\u0001/'},
+        {"name": "café", "emoji": "\U0001f600"},
+        {"small": 4.9e-05, "big": 1e16, "text": "2e5", "fine": 0.1},
+        {"nan": math.nan, "inf": -math.inf, "none": None},
+        {"huge": 2**70, "neg": -0.0},
+    ]
+    for data in samples:
+        expected = "```json\n" + json.dumps(data, indent=2) + "\n```"
+        assert datamd_ext._json_code_block(data) == expected
+
+
+def test_load_json_matches_json_load(tmp_path: Path):
+    import json
+
+    from python_implementation import datamd_ext
+
+    samples = [
+        '[{"id": 1, "v": 0.1, "s": "caf\\u00e9"}, {"id": 2, "v": null}]',
+        '{"huge": 123456789012345678901234567890, "neg": -9223372036854775809}',
+        '{"nan": NaN, "inf": -Infinity, "wide": 1e400}',
+        '{"a": 1, "a": 2, "max": 18446744073709551615}',
+    ]
+    json_file = tmp_path / "data.json"
+    for text in samples:
+        json_file.write_text(text, encoding="utf-8")
+        loaded = datamd_ext._load_json(json_file)
+        assert repr(loaded) == repr(json.loads(text))
+
+    # A big integer straddling a scan window edge is still found
+    window = datamd_ext._DIGIT_SCAN_WINDOW
+    for offset in (window - 19, window - 10, window - 1):
+        text = "[" + " " * (offset - 1) + "1234567890123456789012]"
+        json_file.write_text(text, encoding="utf-8")
+        assert datamd_ext._load_json(json_file) == [1234567890123456789012]
+
+
+def test_transforms_share_the_parsed_frame(tmp_path: Path, monkeypatch):
+    from python_implementation import datamd_ext
+
+    monkeypatch.setattr(datamd_ext.cache_manager, "cache_dir", tmp_path / "cache")
+    (tmp_path / "cache").mkdir()
+    csv_file = tmp_path / "people.csv"
+    csv_file.write_text("name,age\nAda,36\nBob,25\n", encoding="utf-8")
+
+    reads = []
+    read_csv = datamd_ext._read_csv
+
+    def counting_read_csv(*args, **kwargs):
+        reads.append(args)
+        return read_csv(*args, **kwargs)
+
+    monkeypatch.setattr(datamd_ext, "_read_csv", counting_read_csv)
+    (older,) = datamd_ext._handle_csv(csv_file, (",", "filter:age>30"))
+    (sorted_,) = datamd_ext._handle_csv(csv_file, (",", "sort:age"))
+    (plain,) = datamd_ext._handle_csv(csv_file, (",",))
+    assert len(reads) == 1
+    assert "Bob" not in older
+    assert sorted_.index("Bob") < sorted_.index("Ada")
+    assert plain.index("Ada") < plain.index("Bob")
+
+
+def test_pooled_shortcodes_keep_document_order(tmp_path: Path, monkeypatch):
+    import markdown
+    import pytest
+
+    from python_implementation import datamd_ext
+    from python_implementation.exceptions import ShortcodeError
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(datamd_ext.cache_manager, "cache_dir", tmp_path / "cache")
+    (tmp_path / "cache").mkdir()
+    for name in "abc":
+        (tmp_path / f"{name}.csv").write_text(f"{name}\n1\n", encoding="utf-8")
+    pre = datamd_ext.DataMDPreprocessor(markdown.Markdown(), source_path="doc.dmd")
+
+    lines = ["intro"] + [f'{{{{ csv "{name}.csv" }}}}' for name in "abc"]
+    output = pre.run(lines)
+    assert output[0] == "intro"
+    assert [table.split()[1] for table in output[1:]] == ["a", "b", "c"]
+
+    # The first failing shortcode in the document is reported
+    lines[2] = '{{ csv "missing.csv" }}'
+    lines[3] = '{{ nope "c.csv" }}'
+    with pytest.raises(ShortcodeError, match=r"doc\.dmd:3: .*missing\.csv"):
+        pre.run(lines)
+
+    # A single worker renders everything on the calling thread
+    monkeypatch.setattr(datamd_ext.config, "get_max_workers", lambda: 1)
+    monkeypatch.setattr(datamd_ext, "ThreadPoolExecutor", None)
+    lines[2:] = ['{{ csv "b.csv" }}', '{{ csv "c.csv" }}']
+    assert pre.run(lines) == output
+
+
+def test_feature_flags_follow_config_writes(tmp_path: Path):
+    import pytest
+
+    from python_implementation import datamd_ext
+    from python_implementation.exceptions import ShortcodeError
+
+    config = datamd_ext.config
+    assert datamd_ext._feature_enabled("video_support") is True
+    config.set("features.video_support", False)
+    try:
+        assert datamd_ext._feature_enabled("video_support") is False
+        with pytest.raises(ShortcodeError, match="disabled"):
+            datamd_ext._handle_video(tmp_path / "clip.mp4", ())
+    finally:
+        config.set("features.video_support", True)
+        datamd_ext.refresh_feature_flags()
+    assert datamd_ext._feature_enabled("video_support") is True
+
+
+def test_pdf_table_engines_agree(tmp_path: Path, monkeypatch):
+    import pytest
+
+    pymupdf = pytest.importorskip("pymupdf")
+    from python_implementation import datamd_ext
+
+    monkeypatch.setattr(datamd_ext.cache_manager, "cache_dir", tmp_path / "cache")
+    (tmp_path / "cache").mkdir()
+    pdf_file = tmp_path / "table.pdf"
+    with pymupdf.open() as doc:
+        page = doc.new_page()
+        rows = [["Name", "Qty"]] + [[f"item{i}", str(i)] for i in range(5)]
+        for r, row in enumerate(rows):
+            for c, value in enumerate(row):
+                cell = pymupdf.Rect(
+                    72 + c * 120, 72 + r * 20, 192 + c * 120, 92 + r * 20
+                )
+                page.draw_rect(cell, color=(0, 0, 0), width=0.5)
+                page.insert_text((cell.x0 + 3, cell.y1 - 6), value, fontsize=9)
+        doc.save(pdf_file)
+
+    fast = datamd_ext._handle_pdf_table(pdf_file, ("1",))
+    assert fast[0] == "### Table 1"
+    assert "item4" in fast[1]
+    datamd_ext.cache_manager.clear()
+    monkeypatch.setattr(datamd_ext, "PYMUPDF_AVAILABLE", False)
+    assert datamd_ext._handle_pdf_table(pdf_file, ("1",)) == fast
@@ -29,6 +29,172 @@ def test_cache_manager_default_dir():
     assert cache_manager.cache_dir.exists()
 
 
+def test_cache_key_stable_and_parameter_sensitive():
+    """Test cache keys are deterministic and depend on parameters"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache_manager = CacheManager(tmp_dir)
+
+        key1 = cache_manager._get_cache_key("data.csv", sep=",", transform="")
+        key2 = cache_manager._get_cache_key("data.csv", transform="", sep=",")
+        key3 = cache_manager._get_cache_key("data.csv", sep=";", transform="")
+
+        assert key1 == key2
+        assert key1 != key3
+
+
+def test_cache_key_follows_file_contents():
+    """Test cache keys change with the source file's contents"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp_path = Path(tmp_dir)
+        cache_manager = CacheManager(tmp_dir)
+
+        source_file = tmp_path / "data.csv"
+        source_file.write_text("a,b\n1,2\n")
+        key1 = cache_manager._get_cache_key(str(source_file), sep=",")
+        assert cache_manager._get_cache_key(str(source_file), sep=",") == key1
+
+        # Same size, modification time only a nanosecond later
+        stat = source_file.stat()
+        source_file.write_text("a,b\n3,4\n")
+        os.utime(source_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+        key2 = cache_manager._get_cache_key(str(source_file), sep=",")
+        assert key2 != key1
+
+        # Empty files are fingerprinted too
+        source_file.write_text("")
+        assert cache_manager._get_cache_key(str(source_file), sep=",") != key2
+
+
+def test_large_files_are_fingerprinted_from_their_head():
+    """Test files above the full-hash limit are not read past their head"""
+    import cache
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp_path = Path(tmp_dir)
+        cache_manager = CacheManager(tmp_dir, full_hash_max_bytes=1024)
+
+        source_file = tmp_path / "big.csv"
+        data = bytearray(b"x" * (cache._FINGERPRINT_HEAD_BYTES + 4096))
+        source_file.write_bytes(data)
+        stat = source_file.stat()
+        key1 = cache_manager._get_cache_key(str(source_file))
+
+        def rewrite(offset, mtime_ns):
+            data[offset] = ord("y") if data[offset] == ord("x") else ord("x")
+            source_file.write_bytes(data)
+            os.utime(source_file, ns=(stat.st_atime_ns, mtime_ns))
+            return cache_manager._get_cache_key(str(source_file))
+
+        # The tail is not hashed: a change there with the same size and
+        # modification time keeps the key
+        assert rewrite(len(data) - 1, stat.st_mtime_ns + 1) != key1
+        key2 = cache_manager._get_cache_key(str(source_file))
+        cache_manager._fingerprints.clear()
+        assert rewrite(len(data) - 2, stat.st_mtime_ns + 1) == key2
+        # The head is, and so is the modification time
+        cache_manager._fingerprints.clear()
+        assert rewrite(0, stat.st_mtime_ns + 1) != key2
+        assert rewrite(0, stat.st_mtime_ns + 2) != key2
+
+
+class FakeRedis:
+    """Dictionary-backed stand-in for the redis client methods the cache uses"""
+
+    def __init__(self):
+        self.store = {}
+        self.expiry = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def set(self, key, value, ex=None):
+        self.store[key] = bytes(value)
+        self.expiry[key] = ex
+
+    def scan_iter(self, match, count):
+        return [key for key in self.store if key.startswith(match.rstrip("*"))]
+
+    def delete(self, *keys):
+        for key in keys:
+            del self.store[key]
+
+
+def test_cache_shares_entries_through_redis(monkeypatch):
+    """Test entries written by one manager are found by another via Redis"""
+    import cache
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp_path = Path(tmp_dir)
+        source_file = tmp_path / "data.csv"
+        source_file.write_text("a,b\n1,2\n")
+        shared = FakeRedis()
+        writer = CacheManager(str(tmp_path / "one"))
+        reader = CacheManager(str(tmp_path / "two"))
+        writer._redis = reader._redis = shared
+
+        assert writer.set(str(source_file), {"rows": 1}, sep=",")
+        assert len(shared.store) == 1
+        assert reader.get(str(source_file), sep=",") == {"rows": 1}
+        # The hit was copied into the reader's own cache directory
+        assert reader.get_cache_info()["cache_files"] == 1
+
+        # Entries not tied to file contents stay local
+        writer.set("test:not-a-file", "value")
+        assert len(shared.store) == 1
+
+        reader.clear()
+        assert shared.store == {}
+
+        # A failing server turns the shared tier off
+        class Unreachable(Exception):
+            pass
+
+        def refuse(*args, **kwargs):
+            raise Unreachable("connection refused")
+
+        monkeypatch.setattr(
+            cache, "redis", type("redis", (), {"RedisError": Unreachable})
+        )
+        shared.get = refuse
+        assert reader.get(str(source_file), sep=",") is None
+        assert reader._redis is None
+
+
+def test_redis_tier_only_shares_msgpack_entries():
+    """Test pickles never cross Redis and shared entries expire"""
+    import pickle
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp_path = Path(tmp_dir)
+        source_file = tmp_path / "data.csv"
+        source_file.write_text("a,b\n1,2\n")
+        shared = FakeRedis()
+        writer = CacheManager(str(tmp_path / "one"), redis_ttl=60)
+        reader = CacheManager(str(tmp_path / "two"))
+        writer._redis = reader._redis = shared
+
+        assert writer.set(str(source_file), {"rows": 1}, sep=",")
+        assert list(shared.expiry.values()) == [60]
+
+        # Values only pickle can hold are cached locally but not shared
+        assert writer.set(str(source_file), 1 + 2j, sep=";")
+        assert writer.get(str(source_file), sep=";") == 1 + 2j
+        assert len(shared.store) == 1
+
+        # A pickle planted in Redis is ignored, even by a manager that
+        # accepts pickles from its own directory
+        key = next(iter(shared.store))
+        shared.store[key] = pickle.dumps({"rows": 2})
+        assert reader.allow_pickle
+        assert reader.get(str(source_file), sep=",") is None
+
+        # A TTL of 0 leaves expiry to Redis
+        keeper = CacheManager(str(tmp_path / "three"), redis_ttl=0)
+        keeper._redis = shared
+        assert keeper.set(str(source_file), {"rows": 3}, sep="|")
+        assert None in shared.expiry.values()
+
+
 def test_cache_set_get():
     """Test setting and getting cache data"""
     with tempfile.TemporaryDirectory() as tmp_dir:
@@ -53,6 +219,25 @@ def test_cache_set_get():
         assert cached_data == test_data
 
 
+def test_cache_dataframe_roundtrip():
+    """Test DataFrames survive a cache round trip"""
+    pd = pytest.importorskip("pandas")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp_path = Path(tmp_dir)
+        cache_manager = CacheManager(tmp_dir)
+
+        source_file = tmp_path / "test.csv"
+        source_file.write_text("name,age\nAlice,30\nBob,25")
+        time.sleep(0.1)
+
+        df = pd.DataFrame({"name": ["Alice", "Bob"], "age": [30, 25]})
+        assert cache_manager.set(str(source_file), df) is True
+
+        cached_df = cache_manager.get(str(source_file))
+        pd.testing.assert_frame_equal(cached_df, df)
+
+
 def test_cache_with_parameters():
     """Test caching with additional parameters"""
     with tempfile.TemporaryDirectory() as tmp_dir:
@@ -111,6 +296,29 @@ def test_cache_invalidation():
         assert cached_data is None
 
 
+def test_source_mtime_is_never_stale():
+    """Test source file changes are seen right after a lookup"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp_path = Path(tmp_dir)
+        cache_manager = CacheManager(tmp_dir)
+
+        source_file = tmp_path / "test.csv"
+        source_file.write_text("name,age\nAlice,30")
+
+        mtime = cache_manager._get_source_mtime(str(source_file))
+        assert mtime == source_file.stat().st_mtime
+
+        stat = source_file.stat()
+        os.utime(source_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert cache_manager._get_source_mtime(str(source_file)) == (
+            source_file.stat().st_mtime
+        )
+        assert source_file.stat().st_mtime != mtime
+
+        source_file.unlink()
+        assert cache_manager._get_source_mtime(str(source_file)) is None
+
+
 def test_cache_nonexistent_file():
     """Test cache behavior with nonexistent source file"""
     with tempfile.TemporaryDirectory() as tmp_dir:
@@ -158,6 +366,10 @@ def test_cache_clear():
         # Verify cache is empty
         assert len(list(cache_manager.cache_dir.glob("*.cache"))) == 0
 
+        # Other files in the cache directory are left alone
+        assert source_file1.exists()
+        assert source_file2.exists()
+
 
 def test_cache_corruption_handling():
     """Test handling of corrupted cache files"""
@@ -192,6 +404,33 @@ def test_cache_corruption_handling():
         # doesn't crash
 
 
+def test_pickle_entries_are_dropped_when_disallowed():
+    """Test header-less entries are misses, and deleted, without pickle"""
+    import pickle
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp_path = Path(tmp_dir)
+        source_file = tmp_path / "test.csv"
+        source_file.write_text("name,age\nAlice,30\n")
+        time.sleep(0.01)
+
+        legacy = CacheManager(tmp_dir)
+        assert legacy.set(str(source_file), {"valid": "data"})
+        (cache_file,) = legacy.cache_dir.glob("*.cache")
+        cache_file.write_bytes(pickle.dumps({"valid": "pickled"}))
+        assert legacy.get(str(source_file)) == {"valid": "pickled"}
+
+        strict = CacheManager(tmp_dir, allow_pickle=False)
+        assert strict.get(str(source_file)) is None
+        assert not cache_file.exists()
+
+        # msgpack entries still round-trip, and data that needs pickle is
+        # simply not cached
+        assert strict.set(str(source_file), {"valid": "data"})
+        assert strict.get(str(source_file)) == {"valid": "data"}
+        assert strict.set(str(source_file), 1 + 2j, kind="complex") is False
+
+
 def test_cache_info():
     """Test getting cache information"""
     with tempfile.TemporaryDirectory() as tmp_dir:
@@ -47,6 +47,10 @@ def test_sanitize_chart_options():
     assert options["show_grid"] is True
     assert options["legend"] is False
 
+    # Values that only look numeric stay strings
+    options = sanitize_chart_options("version=1.2.3,offset=-1,alpha=.5")
+    assert options == {"version": "1.2.3", "offset": "-1", "alpha": 0.5}
+
     # Empty options
     options = sanitize_chart_options("")
     assert options == {}
@@ -62,5 +66,101 @@ def test_chart_shortcode_parsing():
     pass
 
 
+def test_chart_is_drawn_once_with_options(tmp_path, monkeypatch):
+    """The saved chart carries the title and size options"""
+    import datamd_ext
+    import matplotlib.pyplot as plt
+
+    monkeypatch.setattr(datamd_ext.cache_manager, "cache_dir", tmp_path / "cache")
+    (tmp_path / "cache").mkdir()
+    csv_file = tmp_path / "sales.csv"
+    csv_file.write_text("month,sales\nJan,3\nFeb,5\n", encoding="utf-8")
+
+    saved = []
+
+    def capture(fig, path, **kwargs):
+        (ax,) = fig.axes
+        saved.append((ax.get_title(), tuple(fig.get_size_inches()), len(ax.patches)))
+
+    monkeypatch.setattr(datamd_ext.Figure, "savefig", capture)
+    figures = plt.get_fignums()
+    args = ("bar", "month", "sales", "title=Sales,width=8")
+    (tag,) = datamd_ext._handle_chart(csv_file, args)
+    assert tag == f"![Sales]({tmp_path / 'sales_chart_bar.png'})"
+    assert saved == [("Sales", (8.0, 6.0), 2)]
+    # Nothing is left open in pyplot
+    assert plt.get_fignums() == figures
+
+
+def test_chart_data_reads_only_the_plotted_columns(tmp_path):
+    """Selected columns parse the same as in a full read"""
+    import datamd_ext
+    import pandas as pd
+
+    csv_file = tmp_path / "data.csv"
+    csv_file.write_text(
+        "when,name,qty,flag\n2024-01-01,a,1,true\n2024-01-02,b,,false\n",
+        encoding="utf-8",
+    )
+    full = datamd_ext._read_chart_data(csv_file)
+    for columns in (["name", "qty"], ["when", "flag"], ["qty"]):
+        part = datamd_ext._read_chart_data(csv_file, columns)
+        pd.testing.assert_frame_equal(part, full[columns])
+
+    # A missing column falls back to the whole file
+    part = datamd_ext._read_chart_data(csv_file, ["name", "nope"])
+    pd.testing.assert_frame_equal(part, full)
+
+
+def test_chart_data_is_parsed_once_per_file_version(tmp_path, monkeypatch):
+    """Several charts of one file share a single parse"""
+    import datamd_ext
+
+    monkeypatch.setattr(datamd_ext.cache_manager, "cache_dir", tmp_path / "cache")
+    (tmp_path / "cache").mkdir()
+    csv_file = tmp_path / "sales.csv"
+    csv_file.write_text("month,sales\nJan,3\nFeb,5\n", encoding="utf-8")
+
+    reads = []
+    read = datamd_ext._read_chart_data
+
+    def counting_read(*args):
+        reads.append(args)
+        return read(*args)
+
+    monkeypatch.setattr(datamd_ext, "_read_chart_data", counting_read)
+    monkeypatch.setattr(datamd_ext, "_render_chart", lambda *args: None)
+    for chart_type in ("bar", "line", "pie"):
+        datamd_ext._handle_chart(csv_file, (chart_type, "month", "sales"))
+    assert len(reads) == 1
+
+    csv_file.write_text("month,sales\nJan,3\nFeb,5\nMar,8\n", encoding="utf-8")
+    datamd_ext._handle_chart(csv_file, ("scatter", "month", "sales"))
+    assert len(reads) == 2
+
+
+def test_histogram_defaults_to_the_first_numeric_column(tmp_path, monkeypatch):
+    """Without a Y column the histogram plots the first numeric column"""
+    import datamd_ext
+
+    monkeypatch.setattr(datamd_ext.cache_manager, "cache_dir", tmp_path / "cache")
+    (tmp_path / "cache").mkdir()
+    csv_file = tmp_path / "sizes.csv"
+    csv_file.write_text("name,size,weight\na,3,1.5\nb,5,2.5\n", encoding="utf-8")
+
+    rendered = []
+    monkeypatch.setattr(
+        datamd_ext, "_render_chart", lambda *args: rendered.append(args[3])
+    )
+    datamd_ext._handle_chart(csv_file, ("histogram",))
+    assert rendered == ["size"]
+
+    text_file = tmp_path / "names.csv"
+    text_file.write_text("name\na\nb\n", encoding="utf-8")
+    assert datamd_ext._handle_chart(text_file, ("histogram",)) == [
+        "Error: No numeric columns found for histogram"
+    ]
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
@@ -92,3 +92,13 @@ def test_sanitize_chart_options_complex_values():
     result = sanitize_chart_options("title=Sales & Profit,color=#FF0000")
     expected = {"title": "Sales & Profit", "color": "#FF0000"}
     assert result == expected
+
+
+def test_sanitize_chart_options_returns_fresh_dicts():
+    """Test cached chart options can't be mutated through a returned dict."""
+    first = sanitize_chart_options("title=Sales,width=8")
+    first["title"] = "Changed"
+    assert sanitize_chart_options("title=Sales,width=8") == {
+        "title": "Sales",
+        "width": 8,
+    }
@@ -9,7 +9,7 @@ sys.path.insert(
 )
 
 import pytest
-from process_dmd import main
+from process_dmd import main, process_directory, process_dmd_file
 
 
 def test_cli_help():
@@ -56,5 +56,120 @@ This is a test file.
             pass
 
 
+def test_directory_workers_match_serial_output(tmp_path, monkeypatch):
+    """Pooled directory rendering writes the same files, with CLI settings"""
+    from config import get_config
+
+    # Shortcode paths resolve against the working directory
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data.csv").write_text("a;b\n1;2\n", encoding="utf-8")
+    for name in ("one", "two", "three"):
+        (tmp_path / f"{name}.dmd").write_text(
+            f'# {name}\n\n{{{{ csv "data.csv" }}}}\n', encoding="utf-8"
+        )
+
+    config = get_config()
+    settings = config.to_dict()
+    config.set("processing.default_csv_separator", ";")
+    try:
+        outputs = {}
+        for workers in (1, 3):
+            config.set("performance.max_workers", workers)
+            assert process_directory(tmp_path)
+            outputs[workers] = {
+                path.name: path.read_text(encoding="utf-8")
+                for path in tmp_path.glob("*.html")
+            }
+    finally:
+        for section, values in settings.items():
+            for key, value in values.items():
+                config.set(f"{section}.{key}", value)
+
+    assert len(outputs[3]) == 3
+    assert outputs[3] == outputs[1]
+    assert "|   1 |   2 |" in outputs[3]["two.html"]
+
+
+def test_strict_directory_run_stops_submitting_after_failure(tmp_path, monkeypatch):
+    """Pooled strict runs keep one file per worker in flight, serial by default"""
+    from concurrent.futures import Future
+
+    import process_dmd
+    from config import get_config
+
+    for index in range(6):
+        (tmp_path / f"{index}.dmd").write_text("# Doc\n", encoding="utf-8")
+    rendered = []
+
+    def render(path, **kwargs):
+        rendered.append(Path(path).name)
+        return len(rendered) != 1
+
+    class InlineExecutor:
+        """Runs each submission at once, recording the pool size it got"""
+
+        sizes = []
+
+        def __init__(self, max_workers, initializer, initargs):
+            self.sizes.append(max_workers)
+
+        def submit(self, fn, *args):
+            future = Future()
+            future.set_result(fn(*args))
+            return future
+
+        def shutdown(self, cancel_futures=False):
+            pass
+
+    monkeypatch.setattr(process_dmd, "process_dmd_file", render)
+    monkeypatch.setattr(process_dmd, "ProcessPoolExecutor", InlineExecutor)
+    config = get_config()
+    previous = config.get_max_workers()
+    try:
+        config.set("performance.max_workers", 0)
+        assert not process_directory(tmp_path, strict=True)
+        assert InlineExecutor.sizes == [] and len(rendered) == 1
+
+        rendered.clear()
+        config.set("performance.max_workers", 2)
+        assert not process_directory(tmp_path, strict=True)
+        assert InlineExecutor.sizes == [2] and len(rendered) == 2
+    finally:
+        config.set("performance.max_workers", previous)
+
+
+def test_directory_workers_render_serially():
+    """Directory workers don't start pools of their own"""
+    import process_dmd
+    from config import get_config
+
+    config = get_config()
+    previous = config.get_max_workers()
+    settings = config.to_dict()
+    settings["performance"]["max_workers"] = 4
+    try:
+        process_dmd._init_directory_worker(settings)
+        assert config.get_max_workers() == 1
+    finally:
+        config.set("performance.max_workers", previous)
+
+
+def test_reused_converter_reports_each_source(tmp_path, monkeypatch):
+    """The per-thread converter names the current file and keeps no state"""
+    from exceptions import ShortcodeError
+
+    monkeypatch.chdir(tmp_path)
+    first = tmp_path / "first.dmd"
+    first.write_text("# First\n", encoding="utf-8")
+    second = tmp_path / "second.dmd"
+    second.write_text('# Second\n\n{{ csv "missing.csv" }}\n', encoding="utf-8")
+
+    assert process_dmd_file(str(first))
+    with pytest.raises(ShortcodeError, match=f"at {second}:3"):
+        process_dmd_file(str(second), strict=True)
+    assert process_dmd_file(str(first))
+    assert first.with_suffix(".html").read_text(encoding="utf-8").count("<h1>") == 1
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
@@ -28,12 +28,19 @@ def test_configuration_defaults():
     # Test limit settings
     assert config.get_max_file_size_mb() == 100
     assert config.get_max_pdf_pages() == 50
+    assert config.get_max_table_rows() == 500
+    assert config.get_max_workers() == 0
+    assert config.get_redis_url() == ""
+    assert config.get_redis_ttl() == 86400
+    assert config.is_pickle_cache_allowed() is True
     assert config.get_supported_languages() == ["eng", "spa", "fra", "deu", "ind"]
 
     # Test processing settings
     assert config.get_default_csv_separator() == ","
     assert config.get_default_pdf_strategy() == "lines"
     assert config.get_default_ocr_language() == "eng"
+    assert config.get_tessdata_path() == ""
+    assert config.get_ocr_max_dimension() == 0
 
 
 def test_configuration_from_file():
@@ -74,6 +81,51 @@ def test_configuration_get_set():
     config.set("new.section.value", "test_value")
     assert config.get("new.section.value") == "test_value"
 
+    # Memoized lookups are refreshed after a set
+    assert config.get_chunk_size() == 10000
+    config.set("performance.chunk_size", 500)
+    assert config.get_chunk_size() == 500
+    config.set("performance", {})
+    assert config.get("performance.chunk_size", "missing") == "missing"
+
+
+def test_configuration_instances_do_not_share_sections():
+    """Test that modifying one Configuration doesn't affect defaults or others"""
+    config1 = Configuration()
+    config1.set("features.ocr_enabled", False)
+    config1.set("limits.max_file_size_mb", 5)
+
+    config2 = Configuration()
+    assert config1.is_feature_enabled("ocr_enabled") is False
+    assert config2.is_feature_enabled("ocr_enabled") is True
+    assert config2.get_max_file_size_mb() == 100
+    assert Configuration.DEFAULTS["features"]["ocr_enabled"] is True
+
+
+def test_configuration_save_to_file():
+    """Test saving configuration to a JSON file"""
+    config = Configuration()
+    config.set("application.name", "Saved App")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config_file = os.path.join(tmp_dir, "saved.json")
+        config.save_to_file(config_file)
+
+        loaded = Configuration(config_file)
+        assert loaded.get_application_name() == "Saved App"
+        assert loaded.to_dict() == config.to_dict()
+
+        # Values orjson can't encode on its own are still written
+        config.set("limits.huge", 2**70)
+        config.set("custom.names", {1: "one"})
+        os.chmod(config_file, 0o600)
+        config.save_to_file(config_file)
+        loaded = Configuration(config_file)
+        assert loaded.get("limits.huge") == 2**70
+        assert loaded.get("custom.names") == {"1": "one"}
+        assert os.stat(config_file).st_mode & 0o777 == 0o600
+        assert os.listdir(tmp_dir) == ["saved.json"]
+
 
 def test_configuration_environment_override():
     """Test Configuration environment variable overrides"""
@@ -84,6 +136,22 @@ def test_configuration_environment_override():
     config._load_from_environment()
 
 
+def test_configuration_environment_values(monkeypatch):
+    """Test environment variables are parsed into the right types"""
+    monkeypatch.setenv("DATAMD_APP_NAME", "Env App")
+    monkeypatch.setenv("DATAMD_OCR_ENABLED", "no")
+    monkeypatch.setenv("DATAMD_MAX_PAGES_PDF", "7")
+    monkeypatch.setenv("DATAMD_MAX_FILE_SIZE_MB", "not-a-number")
+    monkeypatch.setenv("DATAMD_DEFAULT_CSV_SEPARATOR", "")
+
+    config = Configuration()
+    assert config.get_application_name() == "Env App"
+    assert config.is_feature_enabled("ocr_enabled") is False
+    assert config.get_max_pdf_pages() == 7
+    assert config.get_max_file_size_mb() == 100
+    assert config.get_default_csv_separator() == ","
+
+
 def test_singleton_config():
     """Test singleton configuration instance"""
     reset_config()  # Reset singleton
@@ -103,3 +171,14 @@ def test_singleton_config():
 
 if __name__ == "__main__":
     pytest.main([__file__])
+
+
+def test_configuration_revision_changes_on_write():
+    """Writes bump the revision used to invalidate cached renders."""
+    config = Configuration()
+    revision = config.revision
+    config.get("features.ocr_enabled")
+    assert config.revision == revision
+
+    config.set("features.ocr_enabled", False)
+    assert config.revision > revision
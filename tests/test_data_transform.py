@@ -9,8 +9,10 @@ sys.path.insert(
 import pandas as pd
 import pytest
 from data_transform import (
+    TransformError,
     DataTransformer,
     apply_transformations,
+    dataframe_to_markdown,
     parse_transform_string,
 )
 
@@ -20,9 +22,12 @@ def test_data_transformer_init():
     df = pd.DataFrame({"A": [1, 2, 3], "B": [4, 5, 6]})
     transformer = DataTransformer(df)
 
-    # Should create a copy of the DataFrame
-    assert transformer.df is not df
-    assert transformer.df.equals(df)
+    # Should wrap the DataFrame without copying it
+    assert transformer.df is df
+
+    # Transformations should leave the original DataFrame untouched
+    transformer.filter("A > 1").sort("B", ascending=False).limit(1)
+    assert df.equals(pd.DataFrame({"A": [1, 2, 3], "B": [4, 5, 6]}))
 
 
 def test_data_transformer_filter():
@@ -48,12 +53,39 @@ def test_data_transformer_filter():
     )
     assert filtered.get_dataframe().reset_index(drop=True).equals(expected)
 
+    # Test two-character operators without spaces
+    filtered = transformer.filter("age<=25")
+    expected = pd.DataFrame(
+        {"name": ["Alice", "David"], "age": [25, 20], "city": ["New York", "Tokyo"]}
+    )
+    assert filtered.get_dataframe().reset_index(drop=True).equals(expected)
+
+    # Test quoted and string values
+    filtered = transformer.filter("name == 'Bob'")
+    assert filtered.get_dataframe()["age"].tolist() == [30]
+    filtered = transformer.filter("age >= 2.5e1")
+    assert filtered.get_dataframe()["name"].tolist() == ["Alice", "Bob", "Charlie"]
+
     # Test string contains filter
     filtered = transformer.filter("city contains york")
     expected = pd.DataFrame({"name": ["Alice"], "age": [25], "city": ["New York"]})
     assert filtered.get_dataframe().reset_index(drop=True).equals(expected)
 
 
+def test_data_transformer_filter_contains():
+    """Test contains filter with missing values and regex patterns"""
+    df = pd.DataFrame(
+        {"city": ["New York", None, "YORKSHIRE", "London"], "n": [1, 2, 3, 4]}
+    )
+    transformer = DataTransformer(df)
+
+    filtered = transformer.filter("city contains york")
+    assert filtered.get_dataframe()["n"].tolist() == [1, 3]
+
+    filtered = transformer.filter("city contains ^lon")
+    assert filtered.get_dataframe()["n"].tolist() == [4]
+
+
 def test_data_transformer_sort():
     """Test DataTransformer sort method"""
     df = pd.DataFrame(
@@ -99,6 +131,38 @@ def test_data_transformer_limit():
     assert limited.get_dataframe().reset_index(drop=True).equals(expected)
 
 
+def test_data_transformer_aggregate():
+    """Test DataTransformer aggregate method"""
+    df = pd.DataFrame(
+        {"dept": ["IT", "HR", "IT"], "salary": [100, 50, 200], "age": [30, 40, 50]}
+    )
+    transformer = DataTransformer(df)
+
+    # Aggregate without grouping produces a single row, laid out as one
+    # group covering every row
+    aggregations = {"salary": "sum", "age": "mean", "dept": "count"}
+    result = transformer.aggregate(aggregations=aggregations)
+    expected = pd.DataFrame(
+        {"index": [True], "salary": [350], "age": [40.0], "dept": [3]}
+    )
+    assert result.get_dataframe().equals(expected)
+    grouped = df.groupby(lambda x: True).agg(aggregations).reset_index()
+    assert result.get_dataframe().equals(grouped)
+
+    # An empty frame has no group, so the result is empty too
+    empty = DataTransformer(df.iloc[:0]).aggregate(aggregations=aggregations)
+    assert empty.get_dataframe().empty
+    assert list(empty.get_dataframe().columns) == ["index", "salary", "age", "dept"]
+
+    # Aggregate by group
+    result = transformer.aggregate(group_by="dept", aggregations={"salary": "max"})
+    expected = pd.DataFrame({"dept": ["HR", "IT"], "salary": [50, 200]})
+    assert result.get_dataframe().equals(expected)
+
+    with pytest.raises(ValueError):
+        transformer.aggregate(aggregations={"salary": "median"})
+
+
 def test_data_transformer_to_markdown():
     """Test DataTransformer to_markdown method"""
     df = pd.DataFrame({"name": ["Alice", "Bob"], "age": [25, 30]})
@@ -173,5 +237,88 @@ def test_apply_transformations():
     assert result.reset_index(drop=True).equals(expected)
 
 
+def test_apply_transformations_sort_limit():
+    """Test sort followed by limit selects the same rows as a full sort"""
+    df = pd.DataFrame(
+        {
+            "name": ["Alice", "Bob", "Charlie", "David", "Eve"],
+            "age": [25, 30, 35, 28, 22],
+            "department": ["IT", "HR", "IT", "Finance", "HR"],
+        }
+    )
+
+    for transform in (
+        "sort:-age|limit:2",
+        "sort:age|limit:3",
+        "sort:name|limit:2",
+        "filter:age>22|filter:department!=HR|sort:-age|limit:2",
+    ):
+        result = apply_transformations(df, transform)
+        operations = parse_transform_string(transform)
+        expected = df
+        for op in operations:
+            if op["type"] == "filter":
+                expected = DataTransformer(expected).filter(op["condition"]).df
+            elif op["type"] == "sort":
+                expected = expected.sort_values(
+                    op["columns"], ascending=op["ascending"]
+                )
+            elif op["type"] == "limit":
+                expected = expected.head(op["n"])
+        assert result.equals(expected), transform
+
+    with pytest.raises(TransformError):
+        apply_transformations(df, "sort:age|limit:0")
+
+
+def test_apply_transformations_sort_limit_ties_and_nans():
+    """Test ties and missing values keep the full sort's rows and order"""
+    df = pd.DataFrame(
+        {
+            "score": [3, 1, 3, 2, 1, 3, 2, 1, 3, 2, 1, 3],
+            "ratio": [0.5, None, 0.1, 0.9, 0.5, None, 0.3, 0.2, 0.5, 0.7, 0.1, 0.4],
+            "n": range(12),
+        }
+    )
+
+    for column, ascending in (
+        ("score", True),
+        ("score", False),
+        ("ratio", True),
+        ("ratio", False),
+    ):
+        sign = "" if ascending else "-"
+        for limit in (1, 2, 5, 20):
+            result = apply_transformations(df, f"sort:{sign}{column}|limit:{limit}")
+            expected = df.sort_values(column, ascending=ascending).head(limit)
+            assert result.equals(expected), (column, ascending, limit)
+
+    # Several sort columns
+    from data_transform import _sort_limit
+
+    for limit in (1, 3, 20):
+        result = _sort_limit(df, ["score", "n"], False, limit)
+        expected = df.sort_values(["score", "n"], ascending=False).head(limit)
+        assert result.equals(expected), limit
+
+
+@pytest.mark.parametrize(
+    "df",
+    [
+        pd.DataFrame({"name": ["Alice", " Bob "], "age": [25, 30]}),
+        pd.DataFrame({"x": [1.5, float("nan"), 1234567.0, 1e-7], "n": [1, 2, 3, 4]}),
+        pd.DataFrame({"flag": [True, False], "label": ["a", None]}),
+        pd.DataFrame({"flag": [True, False]}),
+        pd.DataFrame({"code": ["001", "1,000"], "n": [1, 2]}),
+        pd.DataFrame({"when": pd.to_datetime(["2024-01-01", "2024-01-02"])}),
+        pd.DataFrame({"text": ["line\nbreak", "café"]}),
+        pd.DataFrame({"a": []}),
+    ],
+)
+def test_dataframe_to_markdown_matches_tabulate(df):
+    """The vectorized writer produces exactly what tabulate does"""
+    assert dataframe_to_markdown(df) == df.to_markdown(index=False)
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
@@ -32,6 +32,8 @@ def test_sanitize_numeric_input():
     # Invalid inputs with defaults
     assert sanitize_numeric_input("abc", default=10) == 10
     assert sanitize_numeric_input("", default=5) == 5
+    assert sanitize_numeric_input(["5"], default=5) == 5
+    assert sanitize_numeric_input({"a": 1}, default=None) is None
     assert sanitize_numeric_input(None, default=3.14) == 3.14
 
 
@@ -71,6 +73,8 @@ def test_sanitize_string_input():
     # Character constraints
     result = sanitize_string_input("hello123", allowed_chars="helo")
     assert result == "hello"
+    assert sanitize_string_input("h\u00e9llo 123", allowed_chars="helo") == "hllo"
+    assert sanitize_string_input("hello123", allowed_chars={"1", "2"}) == "12"
 
     # Empty input
     assert sanitize_string_input("") == ""
@@ -99,6 +103,12 @@ def test_sanitize_sheet_name():
     assert sanitize_sheet_name("0") == 0
     assert sanitize_sheet_name("1") == 1
     assert sanitize_sheet_name("5") == 5
+    assert sanitize_sheet_name("-1") == "-1"
+    assert sanitize_sheet_name("\u00b2") == "\u00b2"
+    # Strings int() accepts but that aren't plain digits are names
+    assert sanitize_sheet_name("1_0") == "1_0"
+    assert sanitize_sheet_name("+1") == "+1"
+    assert sanitize_sheet_name(" 1") == " 1"
 
     # Sheet name strings
     assert sanitize_sheet_name("Sheet1") == "Sheet1"
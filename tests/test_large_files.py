@@ -58,12 +58,97 @@ def test_process_large_csv():
         assert "Showing first 100 rows" in result
 
 
-def test_read_excel_chunked():
+def test_read_excel_chunked(tmp_path):
     """Test reading Excel files in chunks"""
-    # This test would require creating an Excel file, which is more complex
-    # For now, we'll skip this test as it requires additional dependencies
-    pass
+    import pandas as pd
+    from datamd_ext import read_excel_chunked
+
+    xlsx_file = tmp_path / "data.xlsx"
+    pd.DataFrame({"n": range(5)}).to_excel(xlsx_file, index=False)
+
+    # The engine is picked from the extension when not given
+    chunks = list(read_excel_chunked(str(xlsx_file), chunk_size=2))
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    assert pd.concat(chunks)["n"].tolist() == list(range(5))
 
 
 if __name__ == "__main__":
     pytest.main([__file__])
+
+
+def test_read_json_records_matches_json_normalize(tmp_path):
+    """Streaming JSON records in batches matches normalizing the whole list"""
+    import json
+
+    import pandas as pd
+
+    pytest.importorskip("ijson")
+    from datamd_ext import _read_json_records
+
+    records = [
+        {"id": i, "score": i / 4, "tags": {"a": i % 2 == 0}, "note": None}
+        for i in range(10)
+    ]
+    records[7]["extra"] = "late column"
+    json_file = tmp_path / "records.json"
+    json_file.write_text(json.dumps(records))
+
+    result = _read_json_records(json_file, batch_size=3)
+    pd.testing.assert_frame_equal(result, pd.json_normalize(records))
+
+    # Non-array documents are left to json.load
+    json_file.write_text(json.dumps({"id": 1}))
+    assert _read_json_records(json_file) is None
+
+
+def test_calamine_matches_default_excel_engine(tmp_path):
+    """The calamine engine reads the same frame as openpyxl"""
+    import datetime
+
+    import pandas as pd
+
+    import datamd_ext
+
+    if not datamd_ext.CALAMINE_AVAILABLE:
+        pytest.skip("python-calamine not installed")
+
+    df = pd.DataFrame(
+        {
+            "int": [1, 2, 3],
+            "float": [1.5, None, 2.0],
+            "text": ["a", None, "c"],
+            "flag": [True, False, True],
+            "when": [
+                datetime.datetime(2020, 1, 1),
+                None,
+                datetime.datetime(2021, 5, 6),
+            ],
+        }
+    )
+    xlsx_file = tmp_path / "data.xlsx"
+    df.to_excel(xlsx_file, index=False)
+
+    assert datamd_ext._excel_engine("xls") == "calamine"
+    pd.testing.assert_frame_equal(
+        pd.read_excel(xlsx_file, engine="calamine"),
+        pd.read_excel(xlsx_file, engine="openpyxl"),
+    )
+
+
+def test_preview_json_records_matches_full_read(tmp_path):
+    """A streamed preview matches the head of the fully normalized records"""
+    import json
+
+    import pandas as pd
+
+    pytest.importorskip("ijson")
+    from datamd_ext import _preview_json_records
+
+    records = [{"id": i, "value": i / 3 if i % 4 else None} for i in range(12)]
+    records[9]["late"] = {"flag": True}
+    json_file = tmp_path / "records.json"
+    json_file.write_text(json.dumps(records))
+
+    preview, total = _preview_json_records(json_file, rows=5, batch_size=4)
+    assert total == 12
+    pd.testing.assert_frame_equal(preview, pd.json_normalize(records).head(5))
@@ -93,3 +93,29 @@ def test_read_csv_chunked_large_file():
 
 if __name__ == "__main__":
     pytest.main([__file__])
+
+
+@pytest.mark.parametrize(
+    "csv_content",
+    [
+        "name,joined,score,active,notes\n"
+        'Ann,2024-01-01,1.5,true,"a, b"\n'
+        "Bob,2024-02-01T10:00:00,,,NA\n",
+        "a,b\n,1\n,2\n",
+        "a,a,\n1,2,3\n",
+        "a,b\n1,2,3\n4,5\n",
+    ],
+)
+def test_read_csv_matches_pandas(tmp_path, csv_content):
+    """The pyarrow reader infers the same frame as pandas' C engine"""
+    import pandas as pd
+    from datamd_ext import _read_csv
+
+    csv_file = tmp_path / "data.csv"
+    csv_file.write_text(csv_content)
+
+    expected = pd.read_csv(csv_file)
+    result = _read_csv(csv_file)
+    assert list(result.columns) == list(expected.columns)
+    assert list(result.dtypes) == list(expected.dtypes)
+    assert result.to_markdown(index=False) == expected.to_markdown(index=False)
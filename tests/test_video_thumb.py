@@ -112,3 +112,41 @@ def test_video_thumb_missing_args():
 
 if __name__ == "__main__":
     pytest.main([__file__])
+
+
+def test_video_thumb_ffmpeg_matches_moviepy(tmp_path, monkeypatch):
+    """ffmpeg and moviepy thumbnails have the same size and content"""
+    import subprocess
+
+    import numpy as np
+    from PIL import Image
+
+    from python_implementation import datamd_ext
+
+    ffmpeg = datamd_ext._ffmpeg_binary()
+    if ffmpeg is None or not datamd_ext.MOVIEPY_AVAILABLE:
+        pytest.skip("ffmpeg and moviepy are both needed")
+
+    video = tmp_path / "clip.mp4"
+    subprocess.run(
+        [ffmpeg, "-v", "error", "-f", "lavfi", "-i"]
+        + ["testsrc=duration=3:size=640x360:rate=10", "-pix_fmt", "yuv420p"]
+        + [str(video)],
+        check=True,
+    )
+
+    (tag,) = datamd_ext._handle_video_thumb(video, ("1", "200"))
+    thumb = tmp_path / "clip_thumb_1s.png"
+    assert tag == f"![Video Thumbnail at 1s]({thumb})"
+    fast = Image.open(thumb).convert("RGB")
+
+    monkeypatch.setattr(datamd_ext, "_ffmpeg_binary", lambda: None)
+    datamd_ext._handle_video_thumb(video, ("1", "200"))
+    slow = Image.open(thumb).convert("RGB")
+    assert fast.size == slow.size == (200, 112)
+    difference = np.abs(np.asarray(fast, int) - np.asarray(slow, int))
+    assert difference.mean() < 8
+
+    monkeypatch.undo()
+    (error,) = datamd_ext._handle_video_thumb(video, ("30",))
+    assert error.startswith("Error generating thumbnail")